@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+"""
+Benchmarks the search, count, pagination, facet and indexing paths against
+synthetic corpora of ``MockModel`` documents, and writes the latencies as
+JSON.
+
+Corpora are built in their own database, which ``--keepdb`` keeps between
+runs so large ones only have to be generated once::
+
+    python benchmarks/run_benchmarks.py --sizes 10000,100000 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+
+import django
+from django.core.management import call_command
+
+# Query terms at these ranks of the corpus vocabulary, from words in most
+# documents to words in a handful.
+TERM_RANKS = {"common": 5, "medium": 500, "rare": 15000}
+
+VOCABULARY_SIZE = 20000
+
+SYLLABLES = [
+    consonant + vowel
+    for consonant in "bcdfghjklmnprstvz"
+    for vowel in ("a", "e", "i", "o", "u", "ai", "ou")
+]
+
+
+def vocabulary(rng):
+    """
+    Returns ``VOCABULARY_SIZE`` distinct made-up words, most frequent first.
+    """
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def documents(rng, words, count, start):
+    """
+    Yields ``count`` unsaved ``MockModel`` objects whose text follows a Zipf
+    distribution over ``words``.
+    """
+    from tests.core.models import MockModel
+
+    # Accumulated once, rather than by every ``choices()`` call.
+    cum_weights = list(accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    epoch = datetime(2015, 1, 1, tzinfo=timezone.utc)
+
+    for n in range(start, start + count):
+        yield MockModel(
+            author=f"author{n % 1000}",
+            foo=" ".join(
+                rng.choices(words, cum_weights=cum_weights, k=rng.randint(50, 200))
+            ),
+            pub_date=epoch + timedelta(minutes=rng.randrange(5 * 365 * 24 * 60)),
+            tag_id=n % 2 + 1,
+        )
+
+
+def generate(size, words, seed):
+    """
+    Grows or shrinks the ``MockModel`` table to ``size`` rows. New rows are
+    generated from ``seed`` and the number already there, so runs with the
+    same sizes benchmark the same corpora.
+    """
+    from tests.core.models import MockModel, MockTag
+
+    for pk, name in ((1, "primary"), (2, "secondary")):
+        MockTag.objects.get_or_create(pk=pk, defaults={"name": name})
+
+    excess = MockModel.objects.order_by("pk").values("pk")[size:]
+    MockModel.objects.filter(pk__in=excess).delete()
+
+    existing = MockModel.objects.count()
+    rng = random.Random(f"{seed}:{existing}")
+    iterator = documents(rng, words, max(size - existing, 0), existing)
+
+    while batch := list(islice(iterator, 10000)):
+        MockModel.objects.bulk_create(batch)
+
+
+def vacuum():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM ANALYZE")
+
+
+def timings(func, repeat):
+    """
+    Calls ``func`` once to warm up, then ``repeat`` times, and returns the
+    durations of the timed calls in milliseconds.
+    """
+    func()
+    durations = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    return durations
+
+
+def summarize(durations):
+    percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return {
+        "n": len(durations),
+        "min_ms": round(min(durations), 3),
+        "mean_ms": round(statistics.fmean(durations), 3),
+        "p50_ms": round(percentiles[49], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "max_ms": round(max(durations), 3),
+    }
+
+
+def benchmarks(term, depth):
+    """
+    Returns the named search operations to time for ``term``, paging
+    ``depth`` results deep.
+    """
+    from haystack.query import SearchQuerySet
+
+    from postgres_fts_backend import PostgresFTSSearchQuerySet
+
+    def sqs():
+        # A fresh queryset each time, so nothing comes from its result cache.
+        return SearchQuerySet(using="default").filter(content=term)
+
+    def search_after():
+        query = PostgresFTSSearchQuerySet(using="default").filter(content=term)
+        return query.search_after(last)[:20]
+
+    last = list(sqs()[depth - 1 : depth])
+    last = last[0] if last else None
+
+    operations = {
+        "search": lambda: list(sqs()[:20]),
+        "count": lambda: sqs().count(),
+        "deep_offset": lambda: list(sqs()[depth : depth + 20]),
+        "facets": lambda: sqs()
+        .facet("name")
+        .date_facet(
+            "pub_date",
+            start_date=datetime(2015, 1, 1, tzinfo=timezone.utc),
+            end_date=datetime(2020, 1, 1, tzinfo=timezone.utc),
+            gap_by="month",
+        )
+        .facet_counts(),
+    }
+    if last is not None:
+        operations["deep_search_after"] = lambda: list(search_after())
+
+    return operations
+
+
+def run(size, words, options):
+    from haystack import connections
+
+    from postgres_fts_backend.models import SearchDocument
+
+    results = []
+
+    start = time.perf_counter()
+    generate(size, words, options.seed)
+    generated = time.perf_counter() - start
+
+    connections["default"].get_backend().clear()
+    start = time.perf_counter()
+    call_command("update_index", "core", verbosity=0, batchsize=options.batch_size)
+    indexed = time.perf_counter() - start
+    vacuum()
+
+    documents = SearchDocument.objects.count()
+    results.append(
+        {
+            "size": size,
+            "benchmark": "update_index",
+            "documents": documents,
+            "seconds": round(indexed, 3),
+            "documents_per_second": round(documents / indexed, 1),
+        }
+    )
+    log(f"{size:>10} update_index {documents / indexed:>12.1f} docs/s")
+    log(f"{size:>10} (generated in {generated:.1f}s)")
+
+    for label, rank in TERM_RANKS.items():
+        term = words[rank]
+        depth = min(size // 2, 10000)
+
+        for name, operation in benchmarks(term, depth).items():
+            summary = summarize(timings(operation, options.repeat))
+            results.append({"size": size, "benchmark": name, "term": label, **summary})
+            log(
+                f"{size:>10} {name:<17} {label:<6} "
+                f"p50 {summary['p50_ms']:>9.3f}ms  p99 {summary['p99_ms']:>9.3f}ms"
+            )
+
+    return results
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        default="10000",
+        help="Comma-separated corpus sizes, run smallest first. Defaults to "
+        "10000; the suite is meant to scale up to 10000000.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=50,
+        help="How many times to time each query. Defaults to 50.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="The update_index batch size. Defaults to 1000.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--keepdb",
+        action="store_true",
+        help="Keep the benchmark database, and its corpus, for the next run.",
+    )
+    parser.add_argument(
+        "--output", help="Write the results to this file rather than stdout."
+    )
+    options = parser.parse_args(argv)
+    sizes = sorted(int(size) for size in options.sizes.split(","))
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ["DJANGO_SETTINGS_MODULE"] = "tests.settings"
+    django.setup()
+
+    from django.db import connection
+    from haystack import connections
+    from haystack.utils.loading import UnifiedIndex
+
+    from tests.search_indexes import SimpleMockSearchIndex
+
+    connection.settings_dict["TEST"]["NAME"] = "haystack_benchmarks"
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=options.keepdb
+    )
+
+    unified_index = UnifiedIndex()
+    unified_index.build(indexes=[SimpleMockSearchIndex()])
+    connections["default"]._index = unified_index
+
+    words = vocabulary(random.Random(options.seed))
+    results = []
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW server_version")
+            (server_version,) = cursor.fetchone()
+
+        for size in sizes:
+            results.extend(run(size, words, options))
+    finally:
+        if not options.keepdb:
+            connection.creation.destroy_test_db(
+                connection.settings_dict["NAME"], verbosity=0
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "postgres": server_version,
+            "repeat": options.repeat,
+            "seed": options.seed,
+        },
+        "results": results,
+    }
+
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,71 +2,1758 @@
 A ORM-based backend for Postgres FTS search \.
 """
 
-from warnings import warn
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from copy import copy
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from time import perf_counter
+from uuid import uuid4
 
-from django.contrib.postgres.search import SearchQuery
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.postgres.search import (
+    CombinedSearchQuery,
+    SearchConfig,
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorExact,
+)
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db import close_old_connections
+from django.db import connections as django_connections
+from django.db import router, transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    DateTimeField,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Func,
+    JSONField,
+    Q,
+    QuerySet,
+    Subquery,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.fields.json import KeyTextTransform, KeyTransform
+from django.db.models.functions import Cast, Trunc
+from django.db.models.lookups import (
+    Exact,
+    GreaterThanOrEqual,
+    IsNull,
+    LessThan,
+    LessThanOrEqual,
+)
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.text import capfirst
 from haystack import connections
 from haystack.backends import (
+    SPELLING_SUGGESTION_HAS_NOT_RUN,
     BaseEngine,
     BaseSearchBackend,
     BaseSearchQuery,
     SearchNode,
     log_query,
 )
-from haystack.constants import DEFAULT_ALIAS
+from haystack.constants import DEFAULT_ALIAS, DJANGO_CT, DJANGO_ID, ID
+from haystack.exceptions import (
+    MoreLikeThisError,
+    SearchBackendError,
+    SearchFieldError,
+    SkipDocument,
+)
 from haystack.inputs import Clean, PythonData
 from haystack.models import SearchResult
-from haystack.utils import get_model_ct_tuple
+from haystack.query import SearchQuerySet
+from haystack.utils import get_identifier, get_model_ct, get_model_ct_tuple
+from haystack.utils import log as logging
+from haystack.utils.app_loading import haystack_get_model
+
+from .signals import search_executed
+
+# The generation ``clear()`` bumps when it empties the whole index.
+ALL_MODELS = "*"
+
+# Prefixes the aliases stored field values are selected under.
+STORED_PREFIX = "stored_"
+
+# ``setweight`` labels in the order ``ts_rank`` takes their weights.
+WEIGHT_LABELS = ["D", "C", "B", "A"]
+
+# The label n-gram fields are stored under, when an index has any, so
+# prefix queries on them match nothing else in the vector.
+NGRAM_WEIGHT_LABEL = WEIGHT_LABELS[-1]
+
+# The ``gap_by`` units of a date facet, from the coarsest to the finest.
+DATE_FACET_UNITS = ["year", "month", "day", "hour", "minute", "second"]
+
+# A query facet of the form ``[low TO high]``, either end of which may be ``*``.
+RANGE_QUERY = re.compile(r"^\[(?P<low>.+) TO (?P<high>.+)\]$")
+
+# A narrow query of the form ``field:value`` or ``field:"value"``, as
+# ``FacetedSearchForm`` narrows by a facet, with reserved characters escaped
+# by a backslash.
+NARROW_QUERY = re.compile(
+    r'^(?P<field>\w+):(?:"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<bare>(?:[^\s"\\]|\\.)+))$'
+)
+ESCAPED = re.compile(r"\\(.)")
+
+# The types query facets compare the values of these field types as, rather
+# than as text.
+FACET_QUERY_TYPES = {
+    "integer": "bigint",
+    "float": "double precision",
+    "decimal": "numeric",
+    "boolean": "boolean",
+    "date": "date",
+    "datetime": "timestamp with time zone",
+}
+
+# The words of a query that spelling suggestions are looked up for.
+WORD = re.compile(r"\w+")
+
+# The ORM lookups Haystack's filter types map to on model attributes.
+FILTER_LOOKUPS = {
+    "content": "search",
+    "fuzzy": "search",
+    "exact": "exact",
+    "gt": "gt",
+    "gte": "gte",
+    "lt": "lt",
+    "lte": "lte",
+    "in": "in",
+    "range": "range",
+    "startswith": "startswith",
+    "endswith": "endswith",
+    "contains": "contains",
+}
+
+# The ``field_type`` of the fields ``autocomplete()`` searches.
+NGRAM_FIELD_TYPES = ("ngram", "edge_ngram")
+
+
+@contextmanager
+def timed(timings, phase):
+    """
+    Adds the seconds spent in the ``with`` block to ``timings[phase]``.
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + perf_counter() - start
+
+
+class IndexCache:
+    """
+    What the backend derives from one build of a ``UnifiedIndex``: the model
+    and fields behind each field name, and an LRU cache of compiled queries.
+    """
+
+    def __init__(self, indexes, size):
+        self.indexes = indexes
+        self.size = size
+        self.fields = defaultdict(list)
+        self.weights = None
+        self.configs = None
+        self.queries = OrderedDict()
+        self.lock = threading.Lock()
+        self.ngrams = False
+
+        for model, index in indexes.items():
+            for name, field in index.fields.items():
+                self.fields[name].append((model, field))
+                self.ngrams |= field.field_type in NGRAM_FIELD_TYPES
+
+    @classmethod
+    def get(cls, unified_index, size=1000):
+        """
+        Returns the cache for the current build of ``unified_index``, making
+        a new one if it has been rebuilt since.
+        """
+        indexes = unified_index.get_indexes()
+        cache = getattr(unified_index, "_postgres_fts_cache", None)
+
+        if cache is None or cache.indexes is not indexes:
+            cache = cls(indexes, size)
+            unified_index._postgres_fts_cache = cache
+
+        return cache
+
+    def get_query(self, key):
+        with self.lock:
+            query = self.queries.get(key)
+
+            if query is not None:
+                self.queries.move_to_end(key)
+
+            return query
+
+    def set_query(self, key, query):
+        if not self.size:
+            return
+
+        with self.lock:
+            self.queries[key] = query
+            self.queries.move_to_end(key)
+
+            while len(self.queries) > self.size:
+                self.queries.popitem(last=False)
+
+
+class PostgresFTSSearchBackend(BaseSearchBackend):
+    # Thread pools for ``PARALLEL_QUERIES``, one per search connection and
+    # shared by the backends every thread gets.
+    executors = {}
+    executors_lock = threading.Lock()
+
+    def __init__(self, connection_alias, **connection_options):
+        super().__init__(connection_alias, **connection_options)
+        self.log = logging.getLogger("haystack")
+        # Seconds to cache hit counts for; counts aren't cached when unset.
+        self.count_cache_timeout = connection_options.get("COUNT_CACHE_TIMEOUT")
+        self.count_cache_alias = connection_options.get("COUNT_CACHE", "default")
+        # Use the planner's row estimate rather than an exact ``COUNT(*)``
+        # once it reaches this many rows.
+        self.estimate_count_threshold = connection_options.get(
+            "ESTIMATE_COUNT_THRESHOLD"
+        )
+        # Seconds to cache search results for; results aren't cached when
+        # unset. Writes through the backend invalidate them sooner.
+        self.result_cache_timeout = connection_options.get("RESULT_CACHE_TIMEOUT")
+        self.result_cache_alias = connection_options.get("RESULT_CACHE", "default")
+        # How many compiled queries to keep per ``UnifiedIndex`` build.
+        self.query_cache_size = connection_options.get("QUERY_CACHE_SIZE", 1000)
+        # Default ``SearchHeadline`` options (``start_sel``, ``stop_sel``,
+        # ``max_fragments``, ...) for highlighted searches.
+        self.highlight_options = connection_options.get("HIGHLIGHT_OPTIONS", {})
+        # Rerun searches that match nothing with their misspelled words
+        # replaced by the closest lexemes in the index.
+        self.fuzzy_fallback = connection_options.get("FUZZY_FALLBACK", False)
+        # How many lexemes of a document ``more_like_this`` searches for.
+        self.more_like_this_terms = connection_options.get("MORE_LIKE_THIS_TERMS", 25)
+        # The text search configuration (a ``regconfig`` name) fields are
+        # parsed with unless their ``analyzer`` names another. Postgres's
+        # ``default_text_search_config`` applies when neither is set.
+        self.config = connection_options.get("CONFIG")
+        # ``CONFIG``, or the database's default once it has been looked up.
+        self._default_config = self.config
+        # Log ``EXPLAIN (ANALYZE, BUFFERS)`` of searches whose queries take
+        # longer than this many seconds. Off when unset.
+        self.slow_query_threshold = connection_options.get("SLOW_QUERY_THRESHOLD")
+        # Count hits and facets on a pooled connection while the page is
+        # fetched, rather than one after the other.
+        self.parallel_queries = connection_options.get("PARALLEL_QUERIES", False)
+        # How many pooled threads, each with its own database connection, run
+        # those counts.
+        self.parallel_workers = connection_options.get("PARALLEL_WORKERS", 4)
+        # Rank with ``ts_rank_cd`` rather than ``ts_rank``.
+        self.rank_cover_density = connection_options.get("RANK_COVER_DENSITY", False)
+        # The normalization bitmask both rank functions take.
+        self.rank_normalization = connection_options.get("RANK_NORMALIZATION", 0)
+
+    def update(self, indexer, iterable, commit=True):
+        if isinstance(iterable, QuerySet):
+            # Stream rows from a server-side cursor rather than loading the
+            # whole queryset into memory.
+            iterable = iterable.iterator(chunk_size=self.batch_size)
+
+        iterator = iter(iterable)
+        while batch := list(islice(iterator, self.batch_size)):
+            self._write_documents(indexer, batch)
+
+    def _write_documents(self, indexer, objs):
+        """
+        Upserts the documents for ``objs`` in a single multi-row
+        ``INSERT ... ON CONFLICT DO UPDATE``.
+
+        An upsert can't write the same row twice, so when an object appears
+        more than once in the batch (as rows of a join through a to-many
+        relation can) only its last document is kept.
+        """
+        from .models import SearchDocument
+
+        labels, _ = self.weights()
+        documents = {}
+
+        for obj in objs:
+            try:
+                prepared = indexer.full_prepare(obj)
+            except SkipDocument:
+                self.log.debug("Indexing for object `%s` skipped", obj)
+                continue
+
+            document = self._build_document(indexer, prepared, labels)
+            documents[document.django_ct, document.django_id] = document
+
+        documents = list(documents.values())
+        SearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["django_ct", "django_id"],
+            update_fields=["text", "data", "vector"],
+        )
+
+        django_ct = get_model_ct(indexer.get_model())
+        if self.include_spelling or self.fuzzy_fallback:
+            self.update_lexemes(
+                django_ct, [document.django_id for document in documents]
+            )
+
+        self.bump_generations([django_ct])
+
+    def update_lexemes(self, django_ct, django_ids):
+        """
+        Adds the lexemes of the given documents' stored vectors, as counted by
+        ``ts_stat``, to the dictionary spelling suggestions are drawn from.
+        """
+        from .models import Lexeme, SearchDocument
+
+        if not django_ids:
+            return
+
+        connection = django_connections[router.db_for_write(Lexeme)]
+        quote = connection.ops.quote_name
+        lexemes = quote(Lexeme._meta.db_table)
+        documents = quote(SearchDocument._meta.db_table)
+
+        # A lexeme's count only grows here; ``refresh_lexemes`` recounts.
+        # Rows are locked in word order, so batches written side by side
+        # (as by several ``fts_worker`` processes) can't deadlock on them.
+        sql = (
+            f"INSERT INTO {lexemes} (word, ndoc) "
+            "SELECT word, ndoc FROM ts_stat(format("
+            f"'SELECT vector FROM {documents} "
+            "WHERE django_ct = %%L AND django_id = ANY(%%L)', %s, %s)) "
+            "ORDER BY word "
+            "ON CONFLICT (word) DO UPDATE "
+            f"SET ndoc = GREATEST({lexemes}.ndoc, EXCLUDED.ndoc)"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [django_ct, django_ids])
+
+    def refresh_lexemes(self):
+        """
+        Rebuilds the lexeme dictionary from every stored vector, dropping
+        lexemes no document has any more and recounting the rest.
+        """
+        from .models import Lexeme, SearchDocument
+
+        using = router.db_for_write(Lexeme)
+        connection = django_connections[using]
+        quote = connection.ops.quote_name
+        lexemes = quote(Lexeme._meta.db_table)
+        documents = quote(SearchDocument._meta.db_table)
+
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {lexemes}")
+            cursor.execute(
+                f"INSERT INTO {lexemes} (word, ndoc) "
+                "SELECT word, ndoc FROM ts_stat(%s)",
+                [f"SELECT vector FROM {documents}"],
+            )
+
+    def _build_document(self, indexer, prepared, labels):
+        from .models import SearchDocument
+
+        data = {
+            key: value
+            for key, value in prepared.items()
+            if key not in (ID, DJANGO_CT, DJANGO_ID)
+        }
+        text = data.pop(indexer.get_content_field(), None) or ""
+
+        vector = None
+        for field in self._vector_fields(indexer):
+            if field.document:
+                value = text
+            else:
+                value = data.get(field.index_fieldname)
+
+                if isinstance(value, (list, tuple)):
+                    value = " ".join(str(item) for item in value)
+
+            if not value:
+                continue
+
+            if field.field_type in NGRAM_FIELD_TYPES:
+                label = NGRAM_WEIGHT_LABEL
+            else:
+                label = labels[field.boost]
+
+            field_vector = SearchVector(
+                Value(str(value)), config=self.search_config(field), weight=label
+            )
+            vector = field_vector if vector is None else vector + field_vector
+
+        return SearchDocument(
+            django_ct=prepared[DJANGO_CT],
+            django_id=prepared[DJANGO_ID],
+            text=text,
+            data=data,
+            vector=vector,
+        )
+
+    def _vector_fields(self, index):
+        """
+        The fields of ``index`` that make up its documents' stored vectors:
+        the document field, n-gram fields and any field with a boost.
+        """
+        return [
+            field
+            for field in index.fields.values()
+            if field.document
+            or field.boost != 1.0
+            or field.field_type in NGRAM_FIELD_TYPES
+        ]
+
+    def weights(self):
+        """
+        Returns the ``setweight`` label each field boost is stored under, and
+        the matching weights array for ``ts_rank``.
+
+        Unboosted fields are labelled ``D``, and up to three larger boosts
+        ``C``, ``B`` and ``A``. When an index has n-gram fields, ``A`` is
+        theirs instead, and two larger boosts get ``C`` and ``B``. Weights
+        are the boosts scaled so the largest is 1.
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+        cache = IndexCache.get(unified_index, self.query_cache_size)
+
+        if cache.weights is None:
+            cache.weights = self._build_weights(cache.indexes)
+
+        return cache.weights
+
+    def _build_weights(self, indexes):
+        boosts = {1.0}
+        ngram_boosts = set()
+
+        for index in indexes.values():
+            for field in self._vector_fields(index):
+                if field.field_type in NGRAM_FIELD_TYPES:
+                    ngram_boosts.add(field.boost)
+                else:
+                    boosts.add(field.boost)
+
+        available = WEIGHT_LABELS[:-1] if ngram_boosts else WEIGHT_LABELS
+        boosts = sorted(boosts)
+        kept = boosts[-len(available) :]
+        labels = defaultdict(lambda: WEIGHT_LABELS[0])
+        labels.update(zip(kept, available))
+
+        largest = max([kept[-1], *ngram_boosts])
+        weights = [boost / largest for boost in kept]
+        weights += [1.0] * (len(available) - len(weights))
+
+        if ngram_boosts:
+            weights.append(max(ngram_boosts) / largest)
+
+        return labels, weights
+
+    def search_config(self, field):
+        """
+        Returns the text search configuration ``field`` is parsed with.
+        """
+        return getattr(field, "analyzer", None) or self.default_config()
+
+    def default_config(self):
+        """
+        Returns ``CONFIG`` or, when it's unset, the database's
+        ``default_text_search_config``.
+
+        Vectors and queries always name their configuration: Postgres only
+        indexes ``to_tsvector()`` given one, so a filter that left it out
+        could never use the GIN indexes ``model_indexes()`` creates.
+        """
+        if self._default_config is None:
+            from .models import SearchDocument
+
+            db = router.db_for_read(SearchDocument)
+            with django_connections[db].cursor() as cursor:
+                cursor.execute("SHOW default_text_search_config")
+                (self._default_config,) = cursor.fetchone()
+
+        return self._default_config
+
+    async def adefault_config(self):
+        """
+        The async counterpart of ``default_config()``.
+        """
+        if self._default_config is None:
+            await sync_to_async(self.default_config)()
+
+        return self._default_config
+
+    def document_config(self):
+        """
+        Returns the text search configuration the document field is parsed
+        with.
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+        field = unified_index.all_searchfields().get(unified_index.document_field)
+        return self.search_config(field)
+
+    def configs(self):
+        """
+        Returns every text search configuration the stored vectors are
+        parsed with, which queries must be parsed with to match them.
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+        cache = IndexCache.get(unified_index, self.query_cache_size)
+
+        if cache.configs is None:
+            configs = {
+                self.search_config(field)
+                for index in cache.indexes.values()
+                for field in self._vector_fields(index)
+            }
+            cache.configs = sorted(configs) or [self.default_config()]
+
+        return cache.configs
+
+    def search_query(self, value, search_type="plain", labels=None):
+        """
+        Returns a ``SearchQuery`` for ``value`` that matches documents in any
+        of the configurations their vectors are parsed with.
+
+        Its lexemes match those stored under the ``setweight`` ``labels``,
+        by default every label but the one n-gram fields are stored under:
+        the prefixes those fields store aren't words of the document.
+        """
+        if labels is None:
+            labels = self.content_labels()
+
+        search_query = None
+
+        for config in self.configs():
+            if labels:
+                query = WeightedSearchQuery(
+                    value, labels, config=config, search_type=search_type
+                )
+            else:
+                query = SearchQuery(value, config=config, search_type=search_type)
+
+            search_query = query if search_query is None else search_query | query
+
+        return search_query
+
+    def content_labels(self):
+        """
+        Returns the ``setweight`` labels content queries match, or ``""``
+        when no index has n-gram fields and they may match any.
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+        cache = IndexCache.get(unified_index, self.query_cache_size)
+
+        if not cache.ngrams:
+            return ""
+
+        return "".join(label for label in WEIGHT_LABELS if label != NGRAM_WEIGHT_LABEL)
+
+    def remove(self, obj, commit=True):
+        app_label, model_name, django_id = get_identifier(obj).split(".", 2)
+        self.remove_documents(f"{app_label}.{model_name}", [django_id])
+
+    def remove_documents(self, django_ct, django_ids):
+        """
+        Deletes the documents of the given objects in a single statement.
+        """
+        from .models import SearchDocument
+
+        SearchDocument.objects.filter(
+            django_ct=django_ct, django_id__in=django_ids
+        ).delete()
+        self.bump_generations([django_ct])
+
+    def clear(self, models=None, commit=True):
+        from .models import Lexeme, SearchDocument
+
+        documents = SearchDocument.objects.all()
+
+        if models:
+            django_cts = [get_model_ct(model) for model in models]
+            documents = documents.filter(django_ct__in=django_cts)
+        else:
+            django_cts = [ALL_MODELS]
+            Lexeme.objects.all().delete()
+
+        documents.delete()
+        self.bump_generations(django_cts)
+
+    def bump_generations(self, django_cts):
+        """
+        Invalidates the cached results of every search over ``django_cts``.
+        """
+        if not self.result_cache_timeout:
+            return
+
+        cache = caches[self.result_cache_alias]
+        cache.set_many(
+            {self._generation_key(django_ct): uuid4().hex for django_ct in django_cts},
+            None,
+        )
+
+    def _generations(self, django_cts):
+        """
+        Returns the current generation of each of ``django_cts``, plus the one
+        ``clear()`` bumps for every model.
+        """
+        cache = caches[self.result_cache_alias]
+        keys = self._generation_keys(django_cts)
+        generations = cache.get_many(keys)
+
+        # A generation that was never set, or has been evicted, starts anew
+        # rather than at some earlier value cached results might still have.
+        missing = {key: uuid4().hex for key in keys if key not in generations}
+        if missing:
+            cache.set_many(missing, None)
+            generations.update(missing)
+
+        return [generations[key] for key in keys]
+
+    async def _agenerations(self, django_cts):
+        """
+        Like ``_generations()``, through the cache's async API.
+        """
+        cache = caches[self.result_cache_alias]
+        keys = self._generation_keys(django_cts)
+        generations = await cache.aget_many(keys)
+
+        missing = {key: uuid4().hex for key in keys if key not in generations}
+        if missing:
+            await cache.aset_many(missing, None)
+            generations.update(missing)
+
+        return [generations[key] for key in keys]
+
+    def _generation_keys(self, django_cts):
+        keys = [self._generation_key(django_ct) for django_ct in django_cts]
+        keys.append(self._generation_key(ALL_MODELS))
+        return keys
+
+    def _generation_key(self, django_ct):
+        return f"postgres_fts_backend:generation:{self.connection_alias}:{django_ct}"
+
+    @log_query
+    def search(self, orm_query, **kwargs):
+        response = self._search(orm_query, **kwargs)
+
+        if not self._needs_corrections(response):
+            return response
+
+        text = kwargs.get("spelling_query") or self.query_text(orm_query)
+        corrections = self.spelling_corrections(text)
+        fuzzy_query = self._apply_corrections(response, orm_query, text, corrections)
+
+        if fuzzy_query is not None:
+            response.update(self._search(fuzzy_query, **kwargs))
+
+        return response
+
+    async def asearch(self, orm_query, **kwargs):
+        """
+        The async counterpart of ``search()``. Queries run through Django's
+        async ORM interface, so an async view can await them directly.
+        """
+        await self.adefault_config()
+        response = await self._asearch(orm_query, **kwargs)
+
+        if not self._needs_corrections(response):
+            return response
+
+        text = kwargs.get("spelling_query") or self.query_text(orm_query)
+        corrections = await sync_to_async(self.spelling_corrections)(text)
+        fuzzy_query = self._apply_corrections(response, orm_query, text, corrections)
+
+        if fuzzy_query is not None:
+            response.update(await self._asearch(fuzzy_query, **kwargs))
+
+        return response
+
+    def _needs_corrections(self, response):
+        return self.include_spelling or (self.fuzzy_fallback and response["hits"] == 0)
+
+    def _apply_corrections(self, response, orm_query, text, corrections):
+        """
+        Adds the spelling suggestion for ``text`` to ``response`` when asked
+        for, and returns the corrected query to rerun when the fuzzy fallback
+        applies, or ``None``.
+        """
+        if self.include_spelling:
+            response["spelling_suggestion"] = (
+                self._correct_text(text, corrections) if corrections else None
+            )
+
+        if self.fuzzy_fallback and corrections and response["hits"] == 0:
+            return self._correct_query(orm_query, corrections)
+
+        return None
+
+    def _search(self, orm_query, **kwargs):
+        result_class = kwargs.get("result_class") or CompactSearchResult
+        timings, matches, rows = self._prepare_search(orm_query, **kwargs)
+        key = None
+        if self.result_cache_timeout:
+            generations = self._generations(self._cached_django_cts(**kwargs))
+            key = self._result_cache_key(rows, generations, **kwargs)
+
+        cached = caches[self.result_cache_alias].get(key) if key else None
+
+        if cached is None:
+            if self._runs_in_parallel(rows):
+                # The page is fetched on this thread's connection meanwhile.
+                wait = self._in_parallel(
+                    timings, "count", lambda: self._hits(matches, **kwargs)
+                )
+                with timed(timings, "sql"):
+                    page = list(rows)
+                hits, facets = wait()
+            else:
+                with timed(timings, "count"):
+                    hits, facets = self._hits(matches, **kwargs)
+                with timed(timings, "sql"):
+                    page = list(rows)
+
+            if key:
+                caches[self.result_cache_alias].set(
+                    key, (hits, facets, page), self.result_cache_timeout
+                )
+        else:
+            hits, facets, page = cached
+
+        with timed(timings, "hydrate"):
+            results = self._build_results(page, result_class)
+
+        details = self._search_details(orm_query, rows, timings, hits, page, cached)
+        if search_executed.has_listeners():
+            search_executed.send(sender=self.__class__, **details())
+
+        for phase in self._slow_phases(timings):
+            if phase == "count":
+                plan = self._explain(matches.db, *self._hits_sql(matches, **kwargs))
+            else:
+                plan = rows.explain(analyze=True, buffers=True)
+
+            self._log_slow_search(timings, phase, plan)
+
+        return self._response(results, hits, facets)
+
+    async def _asearch(self, orm_query, **kwargs):
+        result_class = kwargs.get("result_class") or CompactSearchResult
+        timings, matches, rows = self._prepare_search(orm_query, **kwargs)
+        key = None
+        if self.result_cache_timeout:
+            generations = await self._agenerations(self._cached_django_cts(**kwargs))
+            key = self._result_cache_key(rows, generations, **kwargs)
+
+        cached = await caches[self.result_cache_alias].aget(key) if key else None
+
+        if cached is None:
+            with timed(timings, "count"):
+                hits, facets = await self._ahits(matches, **kwargs)
+            with timed(timings, "sql"):
+                page = [row async for row in rows]
+
+            if key:
+                await caches[self.result_cache_alias].aset(
+                    key, (hits, facets, page), self.result_cache_timeout
+                )
+        else:
+            hits, facets, page = cached
+
+        with timed(timings, "hydrate"):
+            results = await self._abuild_results(page, result_class)
+
+        details = self._search_details(orm_query, rows, timings, hits, page, cached)
+        if search_executed.has_listeners():
+            await search_executed.asend(sender=self.__class__, **details())
+
+        for phase in self._slow_phases(timings):
+            if phase == "count":
+                plan = await sync_to_async(self._explain)(
+                    matches.db, *self._hits_sql(matches, **kwargs)
+                )
+            else:
+                plan = await rows.aexplain(analyze=True, buffers=True)
+
+            self._log_slow_search(timings, phase, plan)
+
+        return self._response(results, hits, facets)
+
+    def _runs_in_parallel(self, queryset):
+        """
+        Whether to count a search's hits on a pooled connection. Not inside
+        a transaction, whose uncommitted writes other connections can't see.
+        """
+        return (
+            self.parallel_queries
+            and not django_connections[queryset.db].in_atomic_block
+        )
+
+    def _in_parallel(self, timings, phase, func):
+        """
+        Starts ``func`` on a pooled thread, which has its own database
+        connection, and returns a function that waits for its result.
+        """
+        with self.executors_lock:
+            executor = self.executors.get(self.connection_alias)
+
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    self.parallel_workers, thread_name_prefix="postgres_fts"
+                )
+                self.executors[self.connection_alias] = executor
+
+        unified_index = connections[self.connection_alias].get_unified_index()
+
+        def run():
+            # Haystack's connections are thread-local; share the caller's
+            # index rather than building another in the pooled thread.
+            connections[self.connection_alias]._index = unified_index
+            # Pooled connections follow ``CONN_MAX_AGE`` as a request's do.
+            close_old_connections()
+            try:
+                with timed(timings, phase):
+                    return func()
+            finally:
+                close_old_connections()
+
+        return executor.submit(run).result
+
+    def _prepare_search(self, orm_query, **kwargs):
+        """
+        Returns the timings a search starts with, and the querysets of its
+        matches and its page of rows.
+        """
+        timings = {}
+        if kwargs.get("build_time") is not None:
+            timings["build"] = kwargs["build_time"]
+
+        with timed(timings, "build"):
+            matches, rows = self.build_search_querysets(orm_query, **kwargs)
+
+        rows = rows[kwargs.get("start_offset", 0) : kwargs.get("end_offset")]
+        return timings, matches, rows
+
+    def _cached_django_cts(self, **kwargs):
+        """
+        Returns the models whose generations a search's cached results
+        depend on.
+        """
+        django_cts = self._django_cts(
+            kwargs.get("models"), kwargs.get("limit_to_registered_models")
+        )
+        return django_cts or self.build_models_list()
+
+    def _response(self, results, hits, facets):
+        response = {"results": results, "hits": hits}
+        if facets is not None:
+            response["facets"] = facets
+
+        return response
+
+    def _search_details(self, orm_query, rows, timings, hits, page, cached):
+        """
+        Returns a function building the ``search_executed`` arguments for a
+        search, so its SQL is only compiled when a receiver is connected.
+        """
+
+        def details():
+            sql, params = rows.query.sql_with_params()
+            return {
+                "using": self.connection_alias,
+                "query": orm_query,
+                "sql": sql,
+                "params": params,
+                "timings": timings,
+                "hits": hits,
+                "rows": len(page),
+                "cached": cached is not None,
+            }
+
+        return details
+
+    def _slow_phases(self, timings):
+        """
+        Returns the phases of a search whose query took longer than
+        ``SLOW_QUERY_THRESHOLD``: ``count`` for the count and facets, and
+        ``sql`` for the page.
+        """
+        if self.slow_query_threshold is None:
+            return []
+
+        return [
+            phase
+            for phase in ("count", "sql")
+            if timings.get(phase, 0.0) > self.slow_query_threshold
+        ]
+
+    def _log_slow_search(self, timings, phase, plan):
+        # ``EXPLAIN ANALYZE`` runs the query again, so slow searches cost
+        # twice as much while ``SLOW_QUERY_THRESHOLD`` is set.
+        self.log.warning(
+            "Slow search %s query (%.3fs, %s):\n%s",
+            "page" if phase == "sql" else phase,
+            timings[phase],
+            ", ".join(f"{phase} {time:.3f}s" for phase, time in timings.items()),
+            plan,
+        )
+
+    def _hits_sql(self, matches, **kwargs):
+        """
+        Returns the SQL and params of the query ``_hits()`` counts
+        ``matches``, and their facets, with.
+        """
+        facets, date_facets, query_facets = self._facets(
+            kwargs.get("facets"), kwargs.get("date_facets"), kwargs.get("query_facets")
+        )
+
+        if facets or date_facets or query_facets:
+            sql, params, _ = self._facet_sql(matches, facets, date_facets, query_facets)
+            return sql, params
+
+        sql, params = matches.order_by().query.sql_with_params()
+        return f"SELECT COUNT(*) FROM ({sql}) AS matches", params
+
+    def _explain(self, using, sql, params):
+        with django_connections[using].cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def query_text(self, orm_query):
+        """
+        Returns the text of the full-text matches in ``orm_query``.
+        """
+        return " ".join(
+            value
+            for search_query in self._content_queries(orm_query)
+            for value in self._query_values(search_query)
+        )
+
+    def _query_values(self, expression):
+        if isinstance(expression, str):
+            yield expression
+        elif isinstance(expression, Value):
+            if isinstance(expression.value, str):
+                yield expression.value
+        elif not isinstance(expression, (SearchConfig, MoreLikeThisQuery)):
+            for source in expression.get_source_expressions():
+                yield from self._query_values(source)
+
+    def spelling_corrections(self, text):
+        """
+        Maps each word of ``text`` none of whose lexemes are in the index to
+        the most similar lexeme that is, as found through the trigram index
+        on the lexeme dictionary.
+        """
+        from .models import Lexeme
+
+        words = list(dict.fromkeys(word.lower() for word in WORD.findall(text)))
+        if not words:
+            return {}
+
+        connection = django_connections[router.db_for_read(Lexeme)]
+        lexemes = connection.ops.quote_name(Lexeme._meta.db_table)
+
+        # Words are stemmed the way the document field's are.
+        document_config = self.document_config()
+        config = "%s::regconfig, " if document_config else ""
+        params = [words]
+        if document_config:
+            params += [document_config, document_config]
+
+        # Stop words, which have no lexemes, are left as they are.
+        sql = (
+            "SELECT term, ("
+            f"SELECT word FROM {lexemes} WHERE word %% term "
+            "ORDER BY similarity(word, term) DESC, ndoc DESC, word LIMIT 1"
+            ") FROM unnest(%s::text[]) AS term "
+            f"WHERE numnode(plainto_tsquery({config}term)) > 0 AND NOT EXISTS ("
+            f"SELECT 1 FROM {lexemes} "
+            f"WHERE word = ANY(tsvector_to_array(to_tsvector({config}term))))"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        return {term: word for term, word in rows if word is not None}
+
+    def _correct_text(self, text, corrections):
+        return WORD.sub(lambda match: corrections.get(match[0].lower(), match[0]), text)
+
+    def _correct_query(self, query, corrections):
+        """
+        Returns a copy of ``query`` with the words of its full-text matches
+        replaced according to ``corrections``.
+        """
+        query = copy(query)
+        children = []
+
+        for child in query.children:
+            if isinstance(child, Q):
+                child = self._correct_query(child, corrections)
+            elif child[0] == "vector":
+                child = ("vector", self._correct_expression(child[1], corrections))
+
+            children.append(child)
+
+        query.children = children
+        return query
+
+    def _correct_expression(self, expression, corrections):
+        if isinstance(expression, str):
+            return self._correct_text(expression, corrections)
+
+        if isinstance(expression, Value):
+            if isinstance(expression.value, str):
+                return Value(self._correct_text(expression.value, corrections))
+            return expression
+
+        if isinstance(expression, (SearchConfig, MoreLikeThisQuery)):
+            return expression
+
+        expression = expression.copy()
+        expression.set_source_expressions(
+            [
+                self._correct_expression(source, corrections)
+                for source in expression.get_source_expressions()
+            ]
+        )
+        return expression
+
+    def _hits(self, matches, **kwargs):
+        """
+        Returns the number of ``matches``, and their facets when any were
+        asked for (or ``None`` otherwise).
+        """
+        facets = kwargs.get("facets")
+        date_facets = kwargs.get("date_facets")
+        query_facets = kwargs.get("query_facets")
+
+        if facets or date_facets or query_facets:
+            return self.facet_counts(matches, facets, date_facets, query_facets)
+
+        return self.count(matches), None
+
+    async def _ahits(self, matches, **kwargs):
+        facets = kwargs.get("facets")
+        date_facets = kwargs.get("date_facets")
+        query_facets = kwargs.get("query_facets")
+
+        if facets or date_facets or query_facets:
+            # Facets are counted with raw SQL, which Django only runs
+            # synchronously.
+            return await sync_to_async(self.facet_counts)(
+                matches, facets, date_facets, query_facets
+            )
+
+        return await self.acount(matches), None
+
+    def stream(self, orm_query, chunk_size=None, **kwargs):
+        """
+        Yields every result ``orm_query`` matches, reading them from a
+        server-side cursor ``chunk_size`` rows at a time so memory stays
+        bounded however many there are.
+        """
+        result_class = kwargs.get("result_class") or CompactSearchResult
+        chunk_size = chunk_size or self.batch_size
+
+        _, rows = self.build_search_querysets(orm_query, **kwargs)
+        rows = rows[kwargs.get("start_offset", 0) : kwargs.get("end_offset")]
+
+        iterator = rows.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(iterator, chunk_size)):
+            yield from self._build_results(chunk, result_class)
+
+    async def astream(self, orm_query, chunk_size=None, **kwargs):
+        """
+        The async counterpart of ``stream()``.
+        """
+        result_class = kwargs.get("result_class") or CompactSearchResult
+        chunk_size = chunk_size or self.batch_size
+
+        await self.adefault_config()
+        _, rows = self.build_search_querysets(orm_query, **kwargs)
+        rows = rows[kwargs.get("start_offset", 0) : kwargs.get("end_offset")]
+        chunk = []
+
+        async for row in rows.aiterator(chunk_size=chunk_size):
+            chunk.append(row)
+
+            if len(chunk) == chunk_size:
+                for result in await self._abuild_results(chunk, result_class):
+                    yield result
+                chunk = []
+
+        for result in await self._abuild_results(chunk, result_class):
+            yield result
+
+    def build_search_querysets(self, orm_query, **kwargs):
+        """
+        Returns the queryset of documents ``orm_query`` matches, and the
+        ranked, ordered rows of stored fields results are built from.
+        """
+        from .models import SearchDocument
+
+        matches = SearchDocument.objects.filter(orm_query)
+
+        django_cts = self._django_cts(
+            kwargs.get("models"), kwargs.get("limit_to_registered_models")
+        )
+        if django_cts:
+            matches = matches.filter(django_ct__in=django_cts)
+
+        if kwargs.get("narrow_queries"):
+            matches = matches.filter(self.narrow_query(kwargs["narrow_queries"]))
+
+        qs = matches
+        _, weights = self.weights()
+        score = None
+
+        rank_query = self.rank_query(orm_query)
+        if rank_query is not None:
+            score = self._rank(rank_query, weights)
+
+        # Boosted terms raise the score of the documents they appear in
+        # without adding to what the query matches.
+        for term, boost in kwargs.get("boost", {}).items():
+            boost_score = self._rank(self.search_query(term), weights) * Value(boost)
+            score = boost_score if score is None else score + boost_score
+
+        if score is not None:
+            # ``ts_rank`` returns a ``real``; widen it so the score handed
+            # back round-trips exactly through ``search_after``.
+            qs = qs.annotate(score=Cast(score, FloatField()))
+
+        sort_by = kwargs.get("sort_by")
+        if sort_by:
+            qs = qs.order_by(*[self._sort_expression(field) for field in sort_by], "id")
+        elif score is not None:
+            qs = qs.order_by("-score", "id")
+        else:
+            qs = qs.order_by("id")
+
+        search_after = kwargs.get("search_after")
+        if search_after is not None:
+            if sort_by:
+                raise ValueError("search_after can't be combined with sort_by.")
+
+            # Keyset pagination: seek past the last result of the previous
+            # page instead of making Postgres walk and discard ``OFFSET`` rows.
+            last_document = SearchDocument.objects.filter(
+                django_ct=f"{search_after.app_label}.{search_after.model_name}",
+                django_id=str(search_after.pk),
+            )
+            after_id = Q(id__gt=Subquery(last_document.values("id")))
+
+            if score is not None:
+                qs = qs.filter(
+                    Q(score__lt=search_after.score)
+                    | Q(score=search_after.score) & after_id
+                )
+            else:
+                qs = qs.filter(after_id)
+
+        values = ["django_ct", "django_id"]
+        if score is not None:
+            values.append("score")
+
+        stored_values = self._stored_values(kwargs.get("fields"))
+
+        highlight = kwargs.get("highlight")
+        if highlight and rank_query is not None:
+            # ``ts_headline`` is costly enough that Postgres only evaluates it
+            # for the rows left after sorting and ``LIMIT``, i.e. the page.
+            stored_values["highlighted"] = self._headline(rank_query, highlight)
+
+        rows = qs.values(*values, **stored_values)
+
+        return matches, rows
+
+    def _django_cts(self, models=None, limit_to_registered_models=None):
+        """
+        The ``django_ct`` values a search is limited to, or an empty list to
+        search every document.
+        """
+        if limit_to_registered_models is None:
+            limit_to_registered_models = getattr(
+                settings, "HAYSTACK_LIMIT_TO_REGISTERED_MODELS", True
+            )
+
+        if models:
+            return sorted(get_model_ct(model) for model in models)
+        elif limit_to_registered_models:
+            return self.build_models_list()
+
+        return []
+
+    def _stored_values(self, fields=None):
+        """
+        Maps the aliases search rows select stored fields under to the
+        expressions that read them, covering only the fields some index
+        marks ``stored`` (and that ``fields`` asks for, when given).
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+        names = set()
+
+        for index in unified_index.get_indexes().values():
+            names.update(
+                field.index_fieldname for field in index.fields.values() if field.stored
+            )
+
+        if fields:
+            names.intersection_update(fields)
+
+        values = {}
+
+        for name in names:
+            if name == unified_index.document_field:
+                values[STORED_PREFIX + name] = F("text")
+            else:
+                values[STORED_PREFIX + name] = KeyTransform(name, "data")
+
+        return values
+
+    def _build_results(self, rows, result_class, load=True):
+        """
+        Turns a page of rows into ``SearchResult`` objects. The objects
+        behind them are loaded together, with one ``in_bulk`` query per
+        model, when the first one is needed (or right away, unless ``load``
+        is false, for result classes that don't load lazily).
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+        indexed_models = unified_index.get_indexed_models()
+        models = {}
+        results = []
+
+        for row in rows:
+            django_ct = row["django_ct"]
+
+            if django_ct not in models:
+                model = haystack_get_model(*django_ct.split("."))
+                models[django_ct] = model if model in indexed_models else None
+
+            model = models[django_ct]
+
+            if model is None:
+                self.log.error(
+                    "Model for document '%s.%s' could not be found.",
+                    django_ct,
+                    row["django_id"],
+                )
+                continue
+
+            app_label, model_name = get_model_ct_tuple(model)
+            pk = model._meta.pk.to_python(row["django_id"])
+            index = unified_index.get_index(model)
+            score = row.get("score", 0)
+            extra = {}
+
+            if "highlighted" in row:
+                extra["highlighted"] = {
+                    unified_index.document_field: [row["highlighted"]]
+                }
+
+            if issubclass(result_class, CompactSearchResult):
+                result = result_class(
+                    app_label, model_name, pk, score, _row=row, _index=index, **extra
+                )
+            else:
+                fields = self._stored_fields(index, row)
+                fields[ID] = f"{django_ct}.{row['django_id']}"
+                result = result_class(
+                    app_label, model_name, pk, score, **fields, **extra
+                )
+
+            result._model = model
+            results.append(result)
+
+        page = ResultPage(results, self.connection_alias)
+
+        if issubclass(result_class, LAZY_RESULT_CLASSES):
+            for result in results:
+                result._page = page
+        elif load:
+            page.load()
+
+        return results
+
+    async def _abuild_results(self, rows, result_class):
+        results = self._build_results(rows, result_class, load=False)
+
+        if not issubclass(result_class, LAZY_RESULT_CLASSES):
+            await ResultPage(results, self.connection_alias).aload()
+
+        return results
+
+    def narrow_query(self, narrow_queries):
+        """
+        Returns the condition documents meet when their field values equal
+        those every one of ``narrow_queries`` names. Anything but
+        ``field:value`` and ``field:"value"`` raises ``SearchBackendError``,
+        rather than being dropped and leaving the search unnarrowed.
+        """
+        search_query = connections[self.connection_alias].get_query()
+        query = Q()
+
+        for narrow_query in sorted(narrow_queries):
+            match = NARROW_QUERY.match(narrow_query.strip())
+            if match is None:
+                raise SearchBackendError(
+                    f"Can't narrow by {narrow_query!r}; narrow queries must "
+                    f'look like field:value or field:"value".'
+                )
+
+            value = match["quoted"] if match["quoted"] is not None else match["bare"]
+            query &= search_query.build_query_fragment(
+                match["field"], "exact", ESCAPED.sub(r"\1", value)
+            )
+
+        return query
+
+    def rank_query(self, orm_query):
+        """
+        Combines the full-text matches in ``orm_query`` into the single
+        ``SearchQuery`` results are ranked against, or ``None`` if nothing in
+        it matches on content.
+        """
+        rank_query = None
+
+        for search_query in self._content_queries(orm_query):
+            if rank_query is None:
+                rank_query = search_query
+            else:
+                rank_query |= search_query
+
+        return rank_query
+
+    def _headline(self, search_query, options):
+        """
+        Returns a ``ts_headline`` of the document field, taking its options
+        from the connection's ``HIGHLIGHT_OPTIONS`` and those passed to
+        ``SearchQuerySet.highlight()``.
+        """
+        if not isinstance(options, dict):
+            options = {}
+
+        options = {
+            "config": self.document_config(),
+            **self.highlight_options,
+            **options,
+        }
+        return SearchHeadline("text", search_query, **options)
+
+    def _rank(self, search_query, weights):
+        return SearchRank(
+            F("vector"),
+            search_query,
+            weights=weights,
+            cover_density=self.rank_cover_density,
+            normalization=Value(self.rank_normalization),
+        )
+
+    def _content_queries(self, query):
+        if query.negated:
+            return
+
+        for child in query.children:
+            if isinstance(child, Q):
+                yield from self._content_queries(child)
+            elif isinstance(child, tuple) and child[0] == "vector":
+                value = child[1]
+                if not isinstance(value, (SearchQuery, CombinedSearchQuery)):
+                    value = self.search_query(value)
+                yield value
+
+    def _sort_expression(self, field):
+        descending = field.startswith("-")
+        value = KeyTransform(field.lstrip("-"), "data")
+        return value.desc() if descending else value.asc()
+
+    def _stored_fields(self, index, row):
+        fields = {}
+
+        for field in index.fields.values():
+            alias = STORED_PREFIX + field.index_fieldname
+
+            if alias in row:
+                fields[field.index_fieldname] = field.convert(row[alias])
+
+        fields.pop("score", None)
+        return fields
+
+    def count(self, queryset):
+        """
+        Returns the number of rows ``queryset`` matches, using a cached or
+        estimated count when the connection is configured to allow it.
+        """
+        queryset = queryset.order_by()
+
+        if self.count_cache_timeout:
+            cache = caches[self.count_cache_alias]
+            key = self._count_cache_key(queryset)
+            hits = cache.get(key)
+
+            if hits is not None:
+                return hits
+
+        hits = None
+
+        if self.estimate_count_threshold is not None:
+            estimate = self.estimate_count(queryset)
+
+            if estimate >= self.estimate_count_threshold:
+                hits = estimate
+
+        if hits is None:
+            hits = queryset.count()
+
+        if self.count_cache_timeout:
+            cache.set(key, hits, self.count_cache_timeout)
+
+        return hits
+
+    async def acount(self, queryset):
+        """
+        The async counterpart of ``count()``.
+        """
+        queryset = queryset.order_by()
+
+        if self.count_cache_timeout:
+            cache = caches[self.count_cache_alias]
+            key = self._count_cache_key(queryset)
+            hits = await cache.aget(key)
+
+            if hits is not None:
+                return hits
+
+        hits = None
+
+        if self.estimate_count_threshold is not None:
+            (plan,) = json.loads(await queryset.aexplain(format="json"))
+            estimate = plan["Plan"]["Plan Rows"]
+
+            if estimate >= self.estimate_count_threshold:
+                hits = estimate
+
+        if hits is None:
+            hits = await queryset.acount()
+
+        if self.count_cache_timeout:
+            await cache.aset(key, hits, self.count_cache_timeout)
+
+        return hits
+
+    def estimate_count(self, queryset):
+        """
+        Returns the planner's estimate of how many rows ``queryset`` matches.
+        """
+        (plan,) = json.loads(queryset.explain(format="json"))
+        return plan["Plan"]["Plan Rows"]
+
+    def facet_counts(self, matches, facets=None, date_facets=None, query_facets=None):
+        """
+        Counts ``matches`` and computes their field, date and query facets
+        together, in a single ``GROUPING SETS`` query. Returns the count and
+        the facets in Haystack's format.
+        """
+        facets, date_facets, query_facets = self._facets(
+            facets, date_facets, query_facets
+        )
+        sql, params, groups = self._facet_sql(
+            matches, facets, date_facets, query_facets
+        )
+
+        with django_connections[matches.db].cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        hits = 0
+        counts = defaultdict(list)
+        query_counts = []
+
+        for row in rows:
+            grouped = [
+                (alias, row[2 * i + 1])
+                for i, alias in enumerate(groups)
+                if row[2 * i] == 0
+            ]
+            count = row[2 * len(groups)]
+
+            if not grouped:
+                # The empty grouping set: every match, once.
+                hits = count
+                query_counts = row[2 * len(groups) + 1 :]
+            elif grouped[0][1] is not None:
+                counts[grouped[0][0]].append((grouped[0][1], count))
+
+        results = {"fields": {}, "dates": {}, "queries": {}}
+
+        for i, (field, options) in enumerate(facets.items()):
+            results["fields"][field] = self._field_facet(
+                counts[f"facet_field_{i}"], **options
+            )
+
+        for i, (field, details) in enumerate(date_facets.items()):
+            results["dates"][field] = self._date_facet(
+                counts[f"facet_date_{i}"], **details
+            )
+
+        for (field, query), count in zip(query_facets, query_counts):
+            results["queries"][f"{field}:{query}"] = count
+
+        return hits, results
+
+    def _facet_sql(self, matches, facets, date_facets, query_facets):
+        """
+        Returns the ``GROUPING SETS`` query ``facet_counts()`` runs, its
+        params, and the aliases of the columns it groups by.
+        """
+        annotations = {}
+
+        for i, field in enumerate(facets):
+            annotations[f"facet_field_{i}"] = self._facet_value(field)
+
+        for i, (field, details) in enumerate(date_facets.items()):
+            value = Cast(KeyTextTransform(field, "data"), DateTimeField())
+            in_range = Q(
+                GreaterThanOrEqual(value, self._facet_datetime(details["start_date"])),
+                LessThan(value, self._facet_datetime(details["end_date"])),
+            )
+            bucket = Trunc(value, details.get("gap_by", "day"), DateTimeField())
+            annotations[f"facet_date_{i}"] = Case(When(in_range, then=bucket))
+
+        for i, (field, query) in enumerate(query_facets):
+            annotations[f"facet_query_{i}"] = ExpressionWrapper(
+                self._facet_query(field, query), BooleanField()
+            )
+
+        quote = django_connections[matches.db].ops.quote_name
+        groups = [alias for alias in annotations if not alias.startswith("facet_q")]
+        queries = [alias for alias in annotations if alias.startswith("facet_q")]
+
+        sql, params = (
+            matches.order_by()
+            .annotate(**annotations)
+            .values(*annotations)
+            .query.sql_with_params()
+        )
+        columns = [f"GROUPING({quote(alias)}), {quote(alias)}" for alias in groups]
+        columns.append("COUNT(*)")
+        columns.extend(f"COUNT(*) FILTER (WHERE {quote(alias)})" for alias in queries)
+        grouping_sets = [f"({quote(alias)})" for alias in groups] + ["()"]
+        sql = (
+            f"SELECT {', '.join(columns)} FROM ({sql}) AS matches "
+            f"GROUP BY GROUPING SETS ({', '.join(grouping_sets)})"
+        )
+
+        return sql, params, groups
+
+    def _facets(self, facets=None, date_facets=None, query_facets=None):
+        """
+        Returns the field, date and query facets of a search in one form: a
+        dict of options per field, a dict of details per date field and a
+        list of ``(field, query)`` pairs.
+        """
+        if isinstance(facets, (list, tuple, set)):
+            facets = {field: {} for field in facets}
+        if isinstance(query_facets, dict):
+            query_facets = list(query_facets.items())
+
+        return facets or {}, date_facets or {}, query_facets or []
+
+    def _facet_value(self, field):
+        unified_index = connections[self.connection_alias].get_unified_index()
+
+        if field == unified_index.document_field:
+            return Func(F("text"), function="to_jsonb", output_field=JSONField())
+
+        return KeyTransform(field, "data")
+
+    def _facet_datetime(self, value):
+        if not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+
+        if settings.USE_TZ and timezone.is_naive(value):
+            value = timezone.make_aware(value)
+
+        return value
+
+    def _facet_query(self, field, query):
+        """
+        Returns the condition documents counted by a query facet meet: a
+        full-text match for the document field, otherwise an inclusive
+        ``[low TO high]`` range or an exact match on the field's value.
+
+        Numbers, booleans and dates are compared as such, with the bounds
+        parsed into the same type, rather than as JSON values, which order
+        every number before every string.
+        """
+        unified_index = connections[self.connection_alias].get_unified_index()
+
+        if field in ("content", unified_index.document_field):
+            return Q(vector=self.search_query(query, search_type="websearch"))
+
+        search_field = unified_index.all_searchfields().get(field)
+        db_type = FACET_QUERY_TYPES.get(getattr(search_field, "field_type", None))
+
+        def typed(expression):
+            if db_type is None:
+                return expression
+
+            return Func(
+                expression,
+                template=f"(%(expressions)s)::{db_type}",
+                output_field=TextField(),
+            )
+
+        value = typed(KeyTextTransform(field, "data"))
+
+        def bound(text):
+            return typed(Value(self._facet_bound(search_field, text)))
+
+        match = RANGE_QUERY.match(query)
+        if match is None:
+            return Q(Exact(value, bound(query)))
+
+        condition = Q(IsNull(value, False))
+        if match["low"] != "*":
+            condition &= Q(GreaterThanOrEqual(value, bound(match["low"])))
+        if match["high"] != "*":
+            condition &= Q(LessThanOrEqual(value, bound(match["high"])))
+
+        return condition
+
+    def _facet_bound(self, search_field, text):
+        """
+        Parses a query facet's value or bound into the type of
+        ``search_field``. One that isn't of that type raises
+        ``SearchBackendError`` here, rather than a ``DataError`` from the
+        cast that aborts the whole search.
+        """
+        field_type = getattr(search_field, "field_type", None)
+        if field_type not in FACET_QUERY_TYPES:
+            return text
 
+        try:
+            if field_type == "boolean":
+                # ``BooleanField.convert`` takes any non-empty string as true.
+                parsed = {"true": True, "false": False}[text.strip().lower()]
+            elif field_type == "decimal":
+                parsed = Decimal(search_field.convert(text))
+            elif field_type in ("date", "datetime"):
+                # Either may be given as a date or a date and time.
+                parsed = parse_datetime(text.strip())
+                if parsed is None:
+                    raise ValueError(text)
+                if field_type == "date":
+                    parsed = parsed.date()
+            else:
+                parsed = search_field.convert(text)
+        except (ArithmeticError, KeyError, SearchFieldError, TypeError, ValueError):
+            raise SearchBackendError(
+                f"Can't query the '{search_field.index_fieldname}' facet with "
+                f"{text!r}, which isn't a valid {field_type}."
+            ) from None
 
-class PostgresFTSSearchBackend(BaseSearchBackend):
-    def update(self, indexer, iterable, commit=True):
-        warn("update is not implemented in this backend")
+        if isinstance(parsed, datetime):
+            parsed = self._facet_datetime(parsed)
 
-    def remove(self, obj, commit=True):
-        warn("remove is not implemented in this backend")
+        return parsed
 
-    def clear(self, models=None, commit=True):
-        warn("clear is not implemented in this backend")
+    def _field_facet(self, counts, limit=None, mincount=1, sort="count", **options):
+        """
+        Turns the counts of each distinct value of a field into a facet. A
+        multivalued field's lists of values are counted value by value.
+        """
+        totals = defaultdict(int)
 
-    @log_query
-    def search(self, orm_query, **kwargs):
-        hits = 0
-        results = []
-        result_class = SearchResult
-        try:
-            (model,) = (
-                connections[self.connection_alias]
-                .get_unified_index()
-                .get_indexed_models()
-            )
-        except ValueError:
-            raise NotImplementedError(
-                "The Postgres FTS backend does not currently searching across"
-                "more than one model"
-            )
+        for value, count in counts:
+            value = json.loads(value)
+            for item in value if isinstance(value, list) else [value]:
+                totals[item] += count
 
-        if kwargs.get("result_class"):
-            result_class = kwargs["result_class"]
+        facet = [(value, count) for value, count in totals.items() if count >= mincount]
 
-        if kwargs.get("models"):
-            (model,) = kwargs["models"]
+        if sort == "index":
+            facet.sort(key=lambda item: str(item[0]))
+        else:
+            facet.sort(key=lambda item: (-item[1], str(item[0])))
 
-        qs = model.objects.filter(orm_query)
+        if limit is not None and limit >= 0:
+            facet = facet[:limit]
 
-        hits += len(qs)
+        return facet
 
-        for match in qs:
-            match.__dict__.pop("score", None)
-            app_label, model_name = get_model_ct_tuple(match)
-            result = result_class(app_label, model_name, match.pk, 0, **match.__dict__)
-            # For efficiency.
-            result._model = match.__class__
-            result._object = match
-            results.append(result)
+    def _date_facet(self, counts, start_date, gap_by="day", gap_amount=1, **details):
+        """
+        Turns the counts of each ``gap_by`` unit into ``gap_amount`` wide
+        buckets, counted from the one ``start_date`` falls into.
+        """
+        if settings.USE_TZ:
+            counts = [(timezone.make_aware(value), count) for value, count in counts]
+
+        if gap_amount == 1:
+            return sorted(counts)
+
+        start = self._facet_datetime(start_date)
+        if settings.USE_TZ:
+            start = timezone.localtime(start)
+        finer = DATE_FACET_UNITS[DATE_FACET_UNITS.index(gap_by) + 1 :]
+        start = start.replace(
+            microsecond=0,
+            **{unit: 1 if unit in ("month", "day") else 0 for unit in finer},
+        )
+        totals = defaultdict(int)
+
+        for value, count in counts:
+            if gap_by in ("year", "month"):
+                step = gap_amount * (12 if gap_by == "year" else 1)
+                months = (value.year - start.year) * 12 + value.month - start.month
+                years, month = divmod(start.month - 1 + months // step * step, 12)
+                bucket = start.replace(year=start.year + years, month=month + 1)
+            else:
+                gap = timedelta(**{f"{gap_by}s": gap_amount})
+                bucket = start + (value - start) // gap * gap
+
+            totals[bucket] += count
+
+        return sorted(totals.items())
+
+    def _result_cache_key(self, rows, generations, **kwargs):
+        # Facets are counted by a query of their own, so they're keyed on
+        # separately from the page's SQL.
+        sql, params = rows.query.sql_with_params()
+        facets = self._facets(
+            kwargs.get("facets"), kwargs.get("date_facets"), kwargs.get("query_facets")
+        )
+        digest = hashlib.md5(
+            repr((sql, params, facets, generations)).encode("utf-8")
+        ).hexdigest()
+        return f"postgres_fts_backend:results:{self.connection_alias}:{digest}"
 
-        return {"results": results, "hits": hits}
+    def _count_cache_key(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.md5(repr((sql, params)).encode("utf-8")).hexdigest()
+        return f"postgres_fts_backend:count:{self.connection_alias}:{digest}"
 
     def prep_value(self, db_field, value):
         return value
@@ -81,7 +1768,374 @@ class PostgresFTSSearchBackend(BaseSearchBackend):
         result_class=None,
         **kwargs,
     ):
-        return {"results": [], "hits": 0}
+        """
+        Returns the documents most similar to ``model_instance``'s, ranked by
+        how well they match an OR of the most heavily weighted lexemes in its
+        stored vector. That query is built inside the search statement, so
+        it uses the GIN index like any other.
+        """
+        return self.search(
+            self._more_like_this_query(model_instance, additional_query_string),
+            start_offset=start_offset,
+            end_offset=end_offset,
+            limit_to_registered_models=limit_to_registered_models,
+            result_class=result_class,
+            **kwargs,
+        )
+
+    async def amore_like_this(
+        self,
+        model_instance,
+        additional_query_string=None,
+        start_offset=0,
+        end_offset=None,
+        limit_to_registered_models=None,
+        result_class=None,
+        **kwargs,
+    ):
+        """
+        The async counterpart of ``more_like_this()``.
+        """
+        return await self.asearch(
+            self._more_like_this_query(model_instance, additional_query_string),
+            start_offset=start_offset,
+            end_offset=end_offset,
+            limit_to_registered_models=limit_to_registered_models,
+            result_class=result_class,
+            **kwargs,
+        )
+
+    def _more_like_this_query(self, model_instance, additional_query_string=None):
+        model = model_instance._meta.concrete_model
+        django_ct = get_model_ct(model)
+        django_id = str(model_instance.pk)
+        _, weights = self.weights()
+
+        similar = MoreLikeThisQuery(
+            django_ct, django_id, weights, self.more_like_this_terms
+        )
+        orm_query = Q(vector=similar) & ~Q(django_ct=django_ct, django_id=django_id)
+
+        if additional_query_string:
+            orm_query &= additional_query_string
+
+        return orm_query
+
+
+class WeightedSearchQuery(SearchQuery):
+    """
+    A ``SearchQuery`` whose lexemes only match those stored under the given
+    ``setweight`` labels, which are added to each lexeme of the parsed
+    ``tsquery``, so the stored vectors' GIN index still serves it.
+    """
+
+    # A quoted lexeme of a ``tsquery``'s text, and its prefix marker if any.
+    LEXEME = r"('(?:[^']|'')*')(?::(\*))?"
+
+    def __init__(
+        self,
+        value,
+        labels,
+        output_field=None,
+        *,
+        config=None,
+        invert=False,
+        search_type="plain",
+    ):
+        super().__init__(
+            value,
+            output_field,
+            config=config,
+            invert=invert,
+            search_type=search_type,
+        )
+        self.labels = labels
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        sql = f"regexp_replace(({sql})::text, %s, %s, 'g')::tsquery"
+        return sql, [*params, self.LEXEME, rf"\1:\2{self.labels}"]
+
+
+class MoreLikeThisQuery(SearchQuery):
+    """
+    A ``tsquery`` ORing together the ``terms`` lexemes of one document's
+    stored vector that score highest, counting each occurrence at the weight
+    of its ``setweight`` label.
+    """
+
+    def __init__(self, django_ct, django_id, weights, terms):
+        super().__init__(Value(django_id))
+        self.django_ct = django_ct
+        self.django_id = django_id
+        self.weights = weights
+        self.terms = terms
+
+    def as_sql(self, compiler, connection, **extra_context):
+        from .models import SearchDocument
+
+        table = connection.ops.quote_name(SearchDocument._meta.db_table)
+        labels = ", ".join(f"'{label}'" for label in WEIGHT_LABELS)
+        sql = (
+            "(SELECT string_agg(quote_literal(lexeme), ' | ')::tsquery FROM ("
+            "SELECT terms.lexeme FROM "
+            f"{table} AS source, unnest(source.vector) AS terms "
+            "WHERE source.django_ct = %s AND source.django_id = %s "
+            "ORDER BY (SELECT sum((%s::float8[])"
+            f"[array_position(ARRAY[{labels}], label::text)]) "
+            "FROM unnest(terms.weights) AS label) DESC NULLS LAST, terms.lexeme "
+            "LIMIT %s) AS top_terms)"
+        )
+        params = [self.django_ct, self.django_id, self.weights, self.terms]
+
+        if self.invert:
+            sql = "!!(%s)" % sql
+
+        return sql, params
+
+
+class ResultPage:
+    """
+    A page of search results whose objects are loaded together, with one
+    ``in_bulk`` query per model.
+    """
+
+    def __init__(self, results, using=DEFAULT_ALIAS):
+        self.results = results
+        self.using = using
+
+    def load(self):
+        self._set_objects(
+            {
+                model: queryset.in_bulk(pks)
+                for model, (queryset, pks) in self._querysets().items()
+            }
+        )
+
+    async def aload(self):
+        self._set_objects(
+            {
+                model: await queryset.ain_bulk(pks)
+                for model, (queryset, pks) in self._querysets().items()
+            }
+        )
+
+    def _querysets(self):
+        """
+        Maps each model on the page to its index's ``read_queryset`` and the
+        primary keys of its results.
+        """
+        unified_index = connections[self.using].get_unified_index()
+        querysets = {}
+
+        for result in self.results:
+            if result.model not in querysets:
+                queryset = unified_index.get_index(result.model).read_queryset(
+                    using=self.using
+                )
+                querysets[result.model] = (queryset, [])
+
+            querysets[result.model][1].append(result.pk)
+
+        return querysets
+
+    def _set_objects(self, objects):
+        for result in self.results:
+            result._object = objects[result.model].get(result.pk)
+            result._page = None
+
+
+class DeferredSearchResult(SearchResult):
+    """
+    A ``SearchResult`` that loads its object, along with the rest of its
+    page's, the first time one of them is accessed.
+    """
+
+    def _get_object(self):
+        if self._object is None and self._page is not None:
+            self._page.load()
+
+        return super()._get_object()
+
+    object = property(_get_object, SearchResult._set_object)
+
+    async def aget_object(self):
+        """
+        Returns the result's object, loading its page's in async code.
+        """
+        if self._object is None and self._page is not None:
+            await self._page.aload()
+
+        return self._object
+
+
+class CompactSearchResult:
+    """
+    A slimmer stand-in for ``SearchResult`` for high-volume searches.
+
+    Results keep a reference to the row they were selected from and convert
+    stored field values only when they are read. Dictionaries of fields are
+    built only when ``get_stored_fields`` or ``get_additional_fields`` is
+    called.
+    """
+
+    __slots__ = (
+        "_fields",
+        "_index",
+        "_model",
+        "_object",
+        "_page",
+        "_row",
+        "app_label",
+        "model_name",
+        "pk",
+        "score",
+    )
+
+    def __init__(self, app_label, model_name, pk, score, **kwargs):
+        self.app_label, self.model_name = app_label, model_name
+        self.pk = pk
+        self.score = score
+        self._model = None
+        self._object = None
+        self._page = None
+        # Either a selected row and the index that can convert its values,
+        # or already converted values passed in as keyword arguments.
+        self._row = kwargs.pop("_row", None)
+        self._index = kwargs.pop("_index", None)
+        self._fields = kwargs
+
+    def __repr__(self):
+        return "<CompactSearchResult: %s.%s (pk=%r)>" % (
+            self.app_label,
+            self.model_name,
+            self.pk,
+        )
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") or attr in self.__slots__:
+            raise AttributeError(attr)
+
+        if attr in self._fields:
+            return self._fields[attr]
+
+        if attr == ID:
+            # The identifier ``update_index --remove`` deletes stale
+            # documents by.
+            return f"{self.app_label}.{self.model_name}.{self.pk}"
+
+        alias = STORED_PREFIX + attr
+        if self._row is None or alias not in self._row:
+            return None
+
+        if self._index is None:
+            self._index = self.searchindex
+
+        value = self._row[alias]
+        field = self._index.fields.get(attr)
+        return field.convert(value) if field is not None else value
+
+    def __getstate__(self):
+        """
+        Returns the result's state for pickling, leaving out its index and
+        page, which are found again as needed.
+        """
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name not in ("_index", "_page")
+        }
+
+    def __setstate__(self, state):
+        self._index = None
+        self._page = None
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _get_object(self):
+        if self._object is None:
+            if self._page is not None:
+                self._page.load()
+            elif self.model is not None:
+                ResultPage([self]).load()
+
+        return self._object
+
+    def _set_object(self, obj):
+        self._object = obj
+
+    object = property(_get_object, _set_object)
+
+    async def aget_object(self):
+        """
+        Returns the result's object, loading its page's in async code.
+        """
+        if self._object is None:
+            if self._page is not None:
+                await self._page.aload()
+            elif self.model is not None:
+                await ResultPage([self]).aload()
+
+        return self._object
+
+    def _get_model(self):
+        if self._model is None:
+            self._model = haystack_get_model(self.app_label, self.model_name)
+
+        return self._model
+
+    def _set_model(self, obj):
+        self._model = obj
+
+    model = property(_get_model, _set_model)
+
+    @property
+    def searchindex(self):
+        return connections[DEFAULT_ALIAS].get_unified_index().get_index(self.model)
+
+    @property
+    def verbose_name(self):
+        return str(capfirst(self.model._meta.verbose_name))
+
+    @property
+    def verbose_name_plural(self):
+        return str(capfirst(self.model._meta.verbose_name_plural))
+
+    def content_type(self):
+        """Returns the content type for the result's model instance."""
+        return str(self.model._meta)
+
+    def get_additional_fields(self):
+        """
+        Returns a dictionary of all of the fields that came back with the
+        result.
+        """
+        names = list(self._fields)
+
+        if self._row is not None:
+            names += [
+                alias[len(STORED_PREFIX) :]
+                for alias in self._row
+                if alias.startswith(STORED_PREFIX)
+            ]
+
+        return {name: getattr(self, name) for name in names}
+
+    def get_stored_fields(self):
+        """
+        Returns a dictionary of all of the stored fields from the
+        ``SearchIndex``.
+        """
+        return {
+            name: getattr(self, name)
+            for name, field in self.searchindex.fields.items()
+            if field.stored
+        }
+
+
+# Result classes whose objects are loaded when first accessed.
+LAZY_RESULT_CLASSES = (CompactSearchResult, DeferredSearchResult)
 
 
 class PostgresFTSSearchQuery(BaseSearchQuery):
@@ -89,9 +2143,67 @@ class PostgresFTSSearchQuery(BaseSearchQuery):
     def __init__(self, using=DEFAULT_ALIAS):
         super().__init__(using)
         self.query_filter = PostgresSearchNode()
+        self.result_class = CompactSearchResult
+        self.search_after = None
+        # Seconds the last ``build_query()`` took, reported with the search.
+        self.build_time = None
 
     def build_query_fragment(self, field, filter_type, value):
+        unified_index = connections[self._using].get_unified_index()
+        search_field = unified_index.all_searchfields().get(field)
+
+        label = None
+
+        if field in ("content", unified_index.document_field):
+            prefix = filter_type == "startswith"
+        elif getattr(search_field, "field_type", None) in NGRAM_FIELD_TYPES:
+            prefix = True
+            label = NGRAM_WEIGHT_LABEL
+        else:
+            lookup = FILTER_LOOKUPS[filter_type]
+            if getattr(value, "input_type_name", None) == "exact":
+                lookup = "exact"
 
+            if lookup == "search":
+                value = SearchQuery(
+                    str(self.prepare_value(value)),
+                    config=self.backend.search_config(search_field),
+                    search_type="websearch",
+                )
+            elif hasattr(value, "input_type_name"):
+                value = value.query_string
+
+            # Anything but full-text filters compares the model attribute
+            # itself, so indexes on its table can serve the lookup.
+            return self.build_model_query(field, lookup, value)
+
+        prepared_value = self.prepare_value(value)
+
+        if prefix:
+            # N-gram fields are part of the stored vector, so prefixes are
+            # matched through its GIN index like any other content, but
+            # only against lexemes under the n-gram fields' label.
+            return Q(vector=self.build_prefix_query(prepared_value, label))
+
+        if filter_type == "in":
+            # Matches nothing, as an empty list of values should.
+            query = Q(pk__in=[])
+            for item in prepared_value:
+                query |= Q(
+                    vector=self.backend.search_query(str(item), search_type="websearch")
+                )
+            return query
+
+        if filter_type == "content":
+            search_string = self.backend.search_query(
+                str(prepared_value), search_type="websearch"
+            )
+        else:
+            search_string = self.backend.search_query(str(prepared_value))
+
+        return Q(vector=search_string)
+
+    def prepare_value(self, value):
         if not hasattr(value, "input_type_name"):
             # Handle when we've got a ``ValuesListQuerySet``...
             if hasattr(value, "values_list"):
@@ -103,24 +2215,94 @@ class PostgresFTSSearchQuery(BaseSearchQuery):
             else:
                 value = PythonData(value)
 
-        prepared_value = value.prepare(self)
+        return value.prepare(self)
+
+    def build_prefix_query(self, value, label=None):
+        """
+        Returns a ``to_tsquery`` matching documents with a lexeme starting
+        with each word of ``value``, stored under the ``setweight`` ``label``
+        if one is given (or else under any content label). Every word is
+        quoted, so nothing in it is read as ``tsquery`` syntax.
+        """
+        terms = [
+            "'%s':*" % word.replace("\\", "\\\\").replace("'", "''")
+            for word in WORD.findall(str(value))
+        ]
+        return self.backend.search_query(
+            " & ".join(terms), search_type="raw", labels=label
+        )
+
+    def build_model_query(self, field, lookup, value):
+        """
+        Matches the documents whose objects pass ``lookup`` against the model
+        attribute behind the indexed ``field``.
 
+        Fields with no model field behind them (``prepare_*`` methods,
+        templates, or a ``model_attr`` that isn't a field) are compared
+        through the prepared value stored in the document's ``data``.
+        """
         unified_index = connections[self._using].get_unified_index()
+        cache = IndexCache.get(unified_index, self.backend.query_cache_size)
+        query = Q()
 
-        if field == "content":
-            model_field = unified_index.fields[unified_index.document_field].model_attr
-        else:
-            try:
-                model_field = unified_index.fields[field].model_attr
-            except KeyError:
-                raise ValueError(f"{field} is not an indexed field.")
+        if field not in cache.fields:
+            raise ValueError(f"{field} is not an indexed field.")
 
-        if filter_type == "content":
-            search_string = SearchQuery(prepared_value, search_type="websearch")
-        else:
-            search_string = prepared_value
+        for model, search_field in cache.fields[field]:
+            django_ct = get_model_ct(model)
+            model_attr = search_field.model_attr
+
+            if not self._is_model_field(model, model_attr):
+                condition = self.build_data_query(search_field, lookup, value)
+                query |= Q(django_ct=django_ct) & condition
+                continue
+
+            objects = (
+                model._default_manager.filter(**{f"{model_attr}__{lookup}": value})
+                .annotate(fts_id=Cast("pk", CharField()))
+                .values("fts_id")
+            )
+            query |= Q(django_ct=django_ct, django_id__in=objects)
+
+        return query
+
+    def _is_model_field(self, model, model_attr):
+        if model_attr is None:
+            return False
+
+        try:
+            model._meta.get_field(model_attr.split("__")[0])
+        except FieldDoesNotExist:
+            return False
+
+        return True
+
+    def build_data_query(self, search_field, lookup, value):
+        """
+        Matches the documents whose stored value of ``search_field`` passes
+        ``lookup``. The values of multivalued fields match when any of
+        their items does, for ``exact`` and ``in``.
+        """
+        name = search_field.index_fieldname
+        key = f"data__{name}"
+
+        if lookup == "search":
+            vector = SearchVector(KeyTextTransform(name, "data"), config=value.config)
+            return Q(SearchVectorExact(vector, value))
+
+        if search_field.is_multivalued and lookup in ("exact", "in"):
+            items = [value] if lookup == "exact" else value
+            # Matches nothing, as an empty list of values should.
+            query = Q(pk__in=[])
+            for item in items:
+                query |= Q(**{f"{key}__contains": [item]})
+            return query
+
+        if lookup == "range":
+            start, end = value
+            return Q(**{f"{key}__gte": start, f"{key}__lte": end})
 
-        return Q(**{f"{model_field}__search": search_string})
+        return Q(**{f"{key}__{lookup}": value})
 
     def build_query(self):
         """
@@ -128,28 +2310,179 @@ class PostgresFTSSearchQuery(BaseSearchQuery):
         be sent to the backend.
         """
         unified_index = connections[self._using].get_unified_index()
+        cache = IndexCache.get(unified_index, self.backend.query_cache_size)
+        key = self.query_filter.cache_key()
+
+        start = perf_counter()
+        final_query = cache.get_query(key) if key is not None else None
+
+        if final_query is None:
+            final_query = self.query_filter.as_orm_query(self.build_query_fragment)
+
+            if not final_query:
+                # Match all.
+                final_query = self.matching_all_fragment()
+
+            if key is not None:
+                cache.set_query(key, final_query)
+
+        self.build_time = perf_counter() - start
+
+        # ``self.boost`` is passed along by ``build_params`` and applied by the
+        # backend when ranking, rather than as extra clauses here.
+        return final_query
+
+    def build_params(self, spelling_query=None):
+        kwargs = super().build_params(spelling_query=spelling_query)
+
+        if self.search_after is not None:
+            kwargs["search_after"] = self.search_after
+
+        if self.build_time is not None:
+            kwargs["build_time"] = self.build_time
+
+        return kwargs
+
+    def set_search_after(self, result):
+        """
+        Only return results that sort after ``result``, a ``SearchResult``
+        from the previous page.
+        """
+        self.search_after = result
+
+    def set_result_class(self, klass):
+        if klass is None:
+            klass = CompactSearchResult
+
+        super().set_result_class(klass)
+
+    def _clone(self, klass=None, using=None):
+        clone = super()._clone(klass=klass, using=using)
+        clone.search_after = self.search_after
+        return clone
+
+    def stream(self, chunk_size=None):
+        """
+        Yields every result of the query from a server-side cursor, without
+        storing them.
+        """
+        final_query = self.build_query()
+        search_kwargs = self.build_params()
+        return self.backend.stream(final_query, chunk_size=chunk_size, **search_kwargs)
+
+    async def astream(self, chunk_size=None):
+        """
+        The async counterpart of ``stream()``.
+        """
+        await self.backend.adefault_config()
+        final_query = self.build_query()
+        search_kwargs = self.build_params()
+        async for result in self.backend.astream(
+            final_query, chunk_size=chunk_size, **search_kwargs
+        ):
+            yield result
+
+    def run_mlt(self, **kwargs):
+        # Haystack's own ``run_mlt`` leaves out the query's slice.
+        kwargs.setdefault("start_offset", self.start_offset)
+        kwargs.setdefault("end_offset", self.end_offset)
+        super().run_mlt(**kwargs)
+
+    async def arun(self, spelling_query=None, **kwargs):
+        """
+        The async counterpart of ``run()``.
+        """
+        # Building the query may need the default configuration, which
+        # takes a query to look up.
+        await self.backend.adefault_config()
+        final_query = self.build_query()
+        search_kwargs = self.build_params(spelling_query=spelling_query)
+
+        if kwargs:
+            search_kwargs.update(kwargs)
 
-        if len(unified_index.indexes) > 1:
-            raise NotImplementedError(
-                "The Postgres FTS backend does not currently searching across"
-                "more than one model"
+        results = await self.backend.asearch(final_query, **search_kwargs)
+        self._results = results.get("results", [])
+        self._hit_count = results.get("hits", 0)
+        self._facet_counts = self.post_process_facets(results)
+        self._spelling_suggestion = results.get("spelling_suggestion", None)
+
+    async def arun_mlt(self, **kwargs):
+        """
+        The async counterpart of ``run_mlt()``.
+        """
+        if self._more_like_this is False or self._mlt_instance is None:
+            raise MoreLikeThisError(
+                "No instance was provided to determine 'More Like This' results."
             )
 
-        final_query = self.query_filter.as_orm_query(self.build_query_fragment)
+        search_kwargs = {
+            "result_class": self.result_class,
+            "start_offset": self.start_offset,
+            "end_offset": self.end_offset,
+        }
+
+        if self.models:
+            search_kwargs["models"] = self.models
 
-        if not final_query:
-            # Match all.
-            final_query = self.matching_all_fragment()
+        if kwargs:
+            search_kwargs.update(kwargs)
 
-        if self.boost:
-            boost_list = []
+        await self.backend.adefault_config()
+        results = await self.backend.amore_like_this(
+            self._mlt_instance, self.build_query(), **search_kwargs
+        )
+        self._results = results.get("results", [])
+        self._hit_count = results.get("hits", 0)
 
-            for boost_word, boost_value in self.boost.items():
-                boost_list.append(self.boost_fragment(boost_word, boost_value))
+    async def _arun_any(self, **kwargs):
+        if self._more_like_this:
+            await self.arun_mlt(**kwargs)
+        elif self._raw_query:
+            # Raw queries go through Haystack's synchronous ``run_raw()``.
+            await sync_to_async(self.run_raw)(**kwargs)
+        else:
+            await self.arun(**kwargs)
 
-            final_query = "%s %s" % (final_query, " ".join(boost_list))
+    async def aget_count(self):
+        """
+        The async counterpart of ``get_count()``.
+        """
+        if self._hit_count is None:
+            # Fetch a single row along with the count.
+            if not self.end_offset:
+                self.end_offset = 1
 
-        return final_query
+            await self._arun_any()
+
+        return self._hit_count
+
+    async def aget_results(self, **kwargs):
+        """
+        The async counterpart of ``get_results()``.
+        """
+        if self._results is None:
+            await self._arun_any(**kwargs)
+
+        return self._results
+
+    async def aget_facet_counts(self):
+        """
+        The async counterpart of ``get_facet_counts()``.
+        """
+        if self._facet_counts is None:
+            await self.arun()
+
+        return self._facet_counts
+
+    async def aget_spelling_suggestion(self, preferred_query=None):
+        """
+        The async counterpart of ``get_spelling_suggestion()``.
+        """
+        if self._spelling_suggestion is SPELLING_SUGGESTION_HAS_NOT_RUN:
+            await self.arun(spelling_query=preferred_query)
+
+        return self._spelling_suggestion
 
     def matching_all_fragment(self):
 
@@ -164,6 +2497,53 @@ class PostgresFTSSearchQuery(BaseSearchQuery):
 
 class PostgresSearchNode(SearchNode):
 
+    def cache_key(self):
+        """
+        Returns a hashable key identifying the filters in this tree, or
+        ``None`` if one of their values can't be part of one.
+        """
+        children = []
+
+        for child in self.children:
+            if hasattr(child, "cache_key"):
+                key = child.cache_key()
+            else:
+                expression, value = child
+                key = self._value_key(value)
+
+                if key is not None:
+                    key = (expression, key)
+
+            if key is None:
+                return None
+
+            children.append(key)
+
+        # The order of children doesn't change what the tree matches.
+        return (self.connector, self.negated, tuple(sorted(children, key=repr)))
+
+    def _value_key(self, value):
+        if hasattr(value, "input_type_name"):
+            key = (
+                type(value),
+                value.query_string,
+                tuple(sorted(value.kwargs.items())),
+            )
+        elif hasattr(value, "values_list"):
+            # Querysets are evaluated when the query is built.
+            return None
+        elif isinstance(value, (list, tuple, set)):
+            key = (type(value), tuple(value))
+        else:
+            key = (type(value), value)
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
     def as_orm_query(self, query_fragment_callback):
         result = []
 
@@ -190,6 +2570,74 @@ class PostgresSearchNode(SearchNode):
         return query
 
 
+class PostgresFTSSearchQuerySet(SearchQuerySet):
+    def search_after(self, result):
+        """
+        Keyset pagination. Returns the results that follow ``result``, the
+        last ``SearchResult`` of the previous page, so deep pages cost the
+        same as the first one. Slice the returned queryset from zero.
+        """
+        clone = self._clone()
+        clone.query.set_search_after(result)
+        return clone
+
+    def iterator(self, chunk_size=None):
+        """
+        Yields every result, reading them from the database ``chunk_size`` at
+        a time, without filling the result cache. Useful for exports and
+        batch jobs over large result sets.
+        """
+        return self.query.stream(chunk_size=chunk_size)
+
+    async def aiterator(self, chunk_size=None):
+        """
+        The async counterpart of ``iterator()``.
+        """
+        async for result in self.query.astream(chunk_size=chunk_size):
+            yield result
+
+    def __aiter__(self):
+        return self.aiterator()
+
+    async def aslice(self, start=0, stop=None):
+        """
+        Returns the results from ``start`` up to ``stop``. Haystack runs the
+        query as soon as a ``SearchQuerySet`` is sliced, so async code asks
+        for a slice with this instead.
+        """
+        clone = self._clone()
+        clone.query.set_limits(start, stop)
+        results = await clone.query.aget_results()
+
+        if self._load_all:
+            await ResultPage(results, self.query._using).aload()
+
+        return results
+
+    async def acount(self):
+        """
+        The async counterpart of ``count()``.
+        """
+        if self._result_count is None:
+            self._result_count = await self.query.aget_count() or 0
+
+        return self._result_count - self._ignored_result_count
+
+    async def afacet_counts(self):
+        """
+        The async counterpart of ``facet_counts()``.
+        """
+        query = self.query if self.query.has_run() else self._clone().query
+        return await query.aget_facet_counts()
+
+    async def aspelling_suggestion(self, preferred_query=None):
+        """
+        The async counterpart of ``spelling_suggestion()``.
+        """
+        query = self.query if self.query.has_run() else self._clone().query
+        return await query.aget_spelling_suggestion(preferred_query)
+
+
 class PostgresFTSEngine(BaseEngine):
     backend = PostgresFTSSearchBackend
     query = PostgresFTSSearchQuery
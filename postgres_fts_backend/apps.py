@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class PostgresFTSBackendConfig(AppConfig):
+    name = "postgres_fts_backend"
+    default_auto_field = "django.db.models.BigAutoField"
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections as django_connections
+from django.db import router
+from haystack.constants import DEFAULT_ALIAS
+
+from postgres_fts_backend.operations import check_queries, missing_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Lists, or creates, the database indexes filters on the indexed models' "
+        "attributes need, and checks the search queries for sequential scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-u",
+            "--using",
+            default=DEFAULT_ALIAS,
+            help="The search connection whose indexes to read. Defaults to "
+            "'default'.",
+        )
+        parser.add_argument(
+            "--create",
+            action="store_true",
+            help="Create the missing indexes.",
+        )
+        parser.add_argument(
+            "--concurrently",
+            action="store_true",
+            help="Build indexes with CREATE INDEX CONCURRENTLY, without locking "
+            "out writes to their tables.",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="EXPLAIN a representative query per model and filtered field, "
+            "and fail if any plan needs a sequential scan.",
+        )
+
+    def handle(self, **options):
+        using = options["using"]
+        concurrently = options["concurrently"]
+        missing = missing_indexes(using)
+
+        for model, name, index in missing:
+            connection = django_connections[router.db_for_write(model)]
+
+            if options["create"]:
+                with connection.schema_editor(atomic=not concurrently) as editor:
+                    editor.add_index(model, index, concurrently=concurrently)
+                self.stdout.write(f"Created {index.name} ({model._meta.label}.{name})")
+            else:
+                with connection.schema_editor(collect_sql=True) as editor:
+                    sql = index.create_sql(model, editor, concurrently=concurrently)
+                self.stdout.write(f"{sql};")
+
+        if not missing and int(options["verbosity"]) >= 1:
+            self.stdout.write("No indexes missing.")
+
+        if options["check"]:
+            scans = check_queries(using)
+
+            for description, tables in scans:
+                self.stderr.write(
+                    f"{description}: sequential scan on {', '.join(tables)}"
+                )
+
+            if scans:
+                raise CommandError(f"{len(scans)} queries need a sequential scan.")
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from postgres_fts_backend.queue import process_queue
+
+
+class Command(BaseCommand):
+    help = "Indexes the objects QueuedSignalProcessor has queued."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="How many queued entries to index per transaction. Defaults to "
+            "1000.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty, rather than waiting for more.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking an empty queue again. "
+            "Defaults to 1.",
+        )
+
+    def handle(self, **options):
+        verbosity = int(options["verbosity"])
+
+        while True:
+            processed = process_queue(options["batch_size"])
+
+            if processed and verbosity >= 2:
+                self.stdout.write(f"Indexed {processed} queued updates.")
+
+            if processed < options["batch_size"]:
+                if options["once"]:
+                    return
+
+                time.sleep(options["sleep"])
@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-18 14:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("django_ct", models.CharField(max_length=255)),
+                ("django_id", models.CharField(max_length=255)),
+                ("text", models.TextField(blank=True)),
+                (
+                    "data",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                ("vector", django.contrib.postgres.search.SearchVectorField(null=True)),
+            ],
+            options={
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["vector"], name="postgres_fts_document_vector"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("django_ct", "django_id"),
+                        name="postgres_fts_document_key",
+                    )
+                ],
+            },
+        ),
+    ]
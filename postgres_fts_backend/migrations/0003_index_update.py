@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("postgres_fts_backend", "0002_lexeme"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IndexUpdate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("using", models.CharField(max_length=255)),
+                ("django_ct", models.CharField(max_length=255)),
+                ("django_id", models.CharField(max_length=255)),
+            ],
+        ),
+    ]
@@ -0,0 +1,78 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    The indexed form of a single model instance.
+
+    ``vector`` holds the precomputed, weighted ``tsvector`` that searches are
+    matched against, and ``data`` the prepared values of every field on the
+    object's ``SearchIndex``.
+    """
+
+    django_ct = models.CharField(max_length=255)
+    django_id = models.CharField(max_length=255)
+    text = models.TextField(blank=True)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    vector = SearchVectorField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["django_ct", "django_id"], name="postgres_fts_document_key"
+            ),
+        ]
+        indexes = [
+            GinIndex(fields=["vector"], name="postgres_fts_document_vector"),
+        ]
+
+    def __str__(self):
+        return f"{self.django_ct}.{self.django_id}"
+
+
+class Lexeme(models.Model):
+    """
+    A lexeme found in the stored vectors, and how many documents it was last
+    counted in.
+
+    Spelling suggestions are looked up among these through the trigram index
+    on ``word``, rather than by scanning documents.
+    """
+
+    word = models.TextField()
+    ndoc = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["word"], name="postgres_fts_lexeme_key"),
+        ]
+        indexes = [
+            GinIndex(
+                fields=["word"],
+                name="postgres_fts_lexeme_word",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+    def __str__(self):
+        return self.word
+
+
+class IndexUpdate(models.Model):
+    """
+    An object saved or deleted since it was last indexed, queued by
+    ``QueuedSignalProcessor`` for the ``fts_worker`` command.
+
+    Entries only name the object; the worker indexes it as it is when the
+    entry is processed, or removes its document if it is gone.
+    """
+
+    using = models.CharField(max_length=255)
+    django_ct = models.CharField(max_length=255)
+    django_id = models.CharField(max_length=255)
+
+    def __str__(self):
+        return f"{self.django_ct}.{self.django_id}"
@@ -0,0 +1,272 @@
+"""
+The database indexes search filters on model attributes rely on, and a
+migration operation that creates them.
+"""
+
+import re
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.core.exceptions import FieldDoesNotExist
+from django.db import NotSupportedError
+from django.db import connections as django_connections
+from django.db import router, transaction
+from django.db.backends.utils import names_digest
+from django.db.migrations.operations.base import Operation
+from django.db.models import Index, UniqueConstraint
+from haystack import connections
+from haystack.constants import DEFAULT_ALIAS
+from haystack.query import SearchQuerySet
+
+from . import NGRAM_FIELD_TYPES
+
+# Field types filters compare with B-tree lookups only.
+UNSEARCHABLE_FIELD_TYPES = (
+    "integer",
+    "float",
+    "decimal",
+    "boolean",
+    "date",
+    "datetime",
+)
+
+SEQ_SCAN = re.compile(r"Seq Scan on (\S+)")
+
+
+def index_name(model, column, suffix):
+    """
+    Returns a name for an index on ``column`` of ``model``'s table, made the
+    way Django names ``Meta.indexes`` so it fits ``Index.max_name_length``.
+    """
+    table_name = model._meta.db_table
+    digest = names_digest(table_name, column, suffix, length=6)
+    return f"{table_name[:11]}_{column[:7]}_{digest}_{suffix}"
+
+
+def declared_indexes(model):
+    """
+    Returns the field lists of the indexes ``model`` declares, through
+    ``Meta.indexes``, unique constraints or ``unique_together``. Partial and
+    expression indexes are left out.
+    """
+    declared = [
+        [field.lstrip("-") for field in index.fields]
+        for index in model._meta.indexes
+        if index.fields and index.condition is None
+    ]
+    declared.extend(
+        list(constraint.fields)
+        for constraint in model._meta.constraints
+        if isinstance(constraint, UniqueConstraint)
+        and constraint.fields
+        and constraint.condition is None
+    )
+    declared.extend(list(fields) for fields in model._meta.unique_together)
+    return declared
+
+
+def model_indexes(using=DEFAULT_ALIAS):
+    """
+    Returns ``(model, field_name, index)`` for every index filters on the
+    registered models' attributes can use and the model doesn't already
+    declare: a B-tree on the column, unless a declared index or unique
+    constraint starts with it, and a GIN over the ``tsvector`` full-text
+    filters on text fields search.
+
+    Document and n-gram fields are searched through the stored vectors, and
+    attributes that aren't columns of the model's own table can't be
+    indexed, so neither gets one.
+    """
+    backend = connections[using].get_backend()
+    unified_index = connections[using].get_unified_index()
+    found = []
+
+    for model, search_index in unified_index.get_indexes().items():
+        declared = declared_indexes(model)
+        expressions = [index.expressions for index in model._meta.indexes]
+
+        for name, field in search_index.fields.items():
+            if field.document or field.field_type in NGRAM_FIELD_TYPES:
+                continue
+
+            if not field.model_attr or "__" in field.model_attr:
+                continue
+
+            try:
+                db_field = model._meta.get_field(field.model_attr)
+            except FieldDoesNotExist:
+                continue
+
+            if not db_field.concrete or db_field.many_to_many:
+                continue
+
+            if not (
+                db_field.primary_key
+                or db_field.unique
+                or db_field.db_index
+                or any(fields[0] == db_field.name for fields in declared)
+            ):
+                index = Index(
+                    fields=[db_field.name],
+                    name=index_name(model, db_field.column, "idx"),
+                )
+                found.append((model, name, index))
+
+            if (
+                field.field_type not in UNSEARCHABLE_FIELD_TYPES
+                and not db_field.is_relation
+            ):
+                index = GinIndex(
+                    SearchVector(db_field.name, config=backend.search_config(field)),
+                    name=index_name(model, db_field.column, "fts"),
+                )
+                if index.expressions not in expressions:
+                    found.append((model, name, index))
+
+    return found
+
+
+def missing_indexes(using=DEFAULT_ALIAS, connection=None):
+    """
+    Returns the ``model_indexes()`` that don't exist yet, looking in
+    ``connection`` or, by default, each model's database.
+    """
+    existing = {}
+    missing = []
+
+    for model, name, index in model_indexes(using):
+        db_connection = connection or django_connections[router.db_for_write(model)]
+        db = db_connection.alias
+        table = model._meta.db_table
+
+        if (db, table) not in existing:
+            with db_connection.cursor() as cursor:
+                existing[db, table] = db_connection.introspection.get_constraints(
+                    cursor, table
+                )
+
+        if index.name not in existing[db, table]:
+            missing.append((model, name, index))
+
+    return missing
+
+
+def check_queries(using=DEFAULT_ALIAS, word="search"):
+    """
+    Runs ``EXPLAIN`` on a representative search of each registered model and
+    a filter on each field ``model_indexes()`` covers, and returns
+    ``(description, tables)`` for each plan that scans a table sequentially.
+
+    Sequential scans are disabled while planning, so Postgres only resorts
+    to one when no index can serve the query; small development tables
+    don't hide missing indexes behind cheap scans.
+    """
+    backend = connections[using].get_backend()
+    sqs = SearchQuerySet(using=using)
+    queries = []
+
+    for model in connections[using].get_unified_index().get_indexed_models():
+        queries.append(
+            (f"{model._meta.label} search", sqs.models(model).auto_query(word))
+        )
+
+    for model, name, index in model_indexes(using):
+        if isinstance(index, GinIndex):
+            queries.append(
+                (f"{model._meta.label}.{name} content", sqs.filter(**{name: word}))
+            )
+            continue
+
+        value = (
+            model._default_manager.exclude(**{index.fields[0]: None})
+            .values_list(index.fields[0], flat=True)
+            .first()
+        )
+        if value is not None:
+            queries.append(
+                (
+                    f"{model._meta.label}.{name} exact",
+                    sqs.filter(**{f"{name}__exact": value}),
+                )
+            )
+
+    scans = []
+
+    for description, query in queries:
+        _, rows = backend.build_search_querysets(
+            query.query.build_query(), **query.query.build_params()
+        )
+
+        with transaction.atomic(using=rows.db):
+            with django_connections[rows.db].cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = rows[:20].explain()
+
+        tables = SEQ_SCAN.findall(plan)
+        if tables:
+            scans.append((description, tables))
+
+    return scans
+
+
+class AddSearchIndexes(Operation):
+    """
+    Creates the ``missing_indexes()`` of an app's models, optionally with
+    ``CREATE INDEX CONCURRENTLY`` (which needs ``atomic = False`` on the
+    migration).
+
+    Like ``RunPython``, the operation reads the current ``SearchIndex``
+    classes and models rather than their historical state, and it leaves
+    the migration state untouched, so the indexes never show up as changes
+    to ``Meta.indexes``.
+    """
+
+    reversible = True
+    reduces_to_sql = False
+
+    def __init__(self, using=DEFAULT_ALIAS, concurrently=False):
+        self.using = using
+        self.concurrently = concurrently
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        self._ensure_not_in_transaction(schema_editor)
+
+        for model, _, index in missing_indexes(self.using, schema_editor.connection):
+            if self._allowed(app_label, schema_editor, model):
+                schema_editor.add_index(model, index, concurrently=self.concurrently)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        self._ensure_not_in_transaction(schema_editor)
+        missing = {
+            index.name
+            for _, _, index in missing_indexes(self.using, schema_editor.connection)
+        }
+
+        for model, _, index in model_indexes(self.using):
+            if index.name not in missing and self._allowed(
+                app_label, schema_editor, model
+            ):
+                schema_editor.remove_index(model, index, concurrently=self.concurrently)
+
+    def describe(self):
+        concurrently = " concurrently" if self.concurrently else ""
+        return f"Create search filter indexes{concurrently}"
+
+    @property
+    def migration_name_fragment(self):
+        return "add_search_indexes"
+
+    def _allowed(self, app_label, schema_editor, model):
+        return model._meta.app_label == app_label and self.allow_migrate_model(
+            schema_editor.connection.alias, model
+        )
+
+    def _ensure_not_in_transaction(self, schema_editor):
+        if self.concurrently and schema_editor.connection.in_atomic_block:
+            raise NotSupportedError(
+                "The AddSearchIndexes operation cannot be executed inside a "
+                "transaction (set atomic = False on the Migration)."
+            )
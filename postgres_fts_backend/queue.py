@@ -0,0 +1,77 @@
+"""
+Indexes the objects ``QueuedSignalProcessor`` queues.
+"""
+
+from collections import defaultdict
+
+from django.db import connections as django_connections
+from django.db import router, transaction
+from haystack import connections
+from haystack.exceptions import NotHandled
+from haystack.utils import log as logging
+from haystack.utils.app_loading import haystack_get_model
+
+log = logging.getLogger("haystack")
+
+
+def process_queue(batch_size=1000):
+    """
+    Takes up to ``batch_size`` entries off the queue and brings their
+    documents up to date, returning how many were taken.
+
+    Entries are claimed with ``FOR UPDATE SKIP LOCKED``, so workers running
+    side by side never process the same ones, and deleted in the same
+    transaction as the documents are written, so a failed batch stays
+    queued. Repeated entries for an object are indexed once.
+    """
+    from .models import IndexUpdate
+
+    db = router.db_for_write(IndexUpdate)
+    connection = django_connections[db]
+    table = connection.ops.quote_name(IndexUpdate._meta.db_table)
+    pending = defaultdict(set)
+
+    with transaction.atomic(using=db):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {table} WHERE id IN ("
+                f"SELECT id FROM {table} ORDER BY id LIMIT %s "
+                f"FOR UPDATE SKIP LOCKED"
+                f') RETURNING "using", django_ct, django_id',
+                [batch_size],
+            )
+            entries = cursor.fetchall()
+
+        for using, django_ct, django_id in entries:
+            pending[using, django_ct].add(django_id)
+
+        for (using, django_ct), django_ids in pending.items():
+            update_documents(using, django_ct, django_ids)
+
+    return len(entries)
+
+
+def update_documents(using, django_ct, django_ids):
+    """
+    Indexes the given objects of one model in bulk, and removes the documents
+    of those that no longer exist or that the index's ``index_queryset``
+    leaves out.
+    """
+    backend = connections[using].get_backend()
+    model = haystack_get_model(*django_ct.split("."))
+
+    try:
+        index = connections[using].get_unified_index().get_index(model)
+    except NotHandled:
+        log.warning("Skipping queued updates to unindexed model %s.", django_ct)
+        return
+
+    pks = [model._meta.pk.to_python(django_id) for django_id in django_ids]
+    objs = list(index.index_queryset(using=using).filter(pk__in=pks))
+
+    if objs:
+        backend.update(index, objs)
+
+    removed = set(django_ids) - {str(obj.pk) for obj in objs}
+    if removed:
+        backend.remove_documents(django_ct, sorted(removed))
@@ -0,0 +1,51 @@
+from django.db import models
+from django.dispatch import Signal
+from haystack.signals import BaseSignalProcessor
+from haystack.utils import get_model_ct
+
+# Sent by the backend after every search, with:
+#
+# - ``using``: the search connection alias.
+# - ``query``: the ORM ``Q`` the search matched.
+# - ``sql`` and ``params``: the compiled query of the result rows.
+# - ``timings``: seconds spent per phase; ``build`` (compiling the query),
+#   ``count`` (the hit count and facets), ``sql`` (fetching the rows) and
+#   ``hydrate`` (building ``SearchResult`` objects). Phases a cached result
+#   skips are left out.
+# - ``hits`` and ``rows``: the number of matches, and of rows on the page.
+# - ``cached``: whether the result cache answered the search.
+search_executed = Signal()
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    Queues indexed objects that are saved or deleted, rather than indexing
+    them during the request. Each save or delete costs one ``INSERT``, made
+    in the same transaction; the ``fts_worker`` command indexes the queue in
+    batches.
+    """
+
+    def setup(self):
+        models.signals.post_save.connect(self.enqueue)
+        models.signals.post_delete.connect(self.enqueue)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.enqueue)
+        models.signals.post_delete.disconnect(self.enqueue)
+
+    def enqueue(self, sender, instance, **kwargs):
+        from .models import IndexUpdate
+
+        updates = [
+            IndexUpdate(
+                using=using,
+                django_ct=get_model_ct(sender),
+                django_id=str(instance.pk),
+            )
+            for using in self.connection_router.for_write(instance=instance)
+            if sender
+            in self.connections[using].get_unified_index().get_indexed_models()
+        ]
+
+        if updates:
+            IndexUpdate.objects.bulk_create(updates)
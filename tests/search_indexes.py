@@ -12,6 +12,51 @@ class SimpleMockSearchIndex(indexes.SearchIndex, indexes.Indexable):
         return MockModel
 
 
+class BoostMockSearchIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, model_attr="foo")
+    name = indexes.CharField(model_attr="author", boost=2.0)
+    pub_date = indexes.DateTimeField(model_attr="pub_date")
+
+    def get_model(self):
+        return MockModel
+
+
+class ConfigMockSearchIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, model_attr="foo", analyzer="english")
+    name = indexes.CharField(model_attr="author", boost=2.0, analyzer="simple")
+    pub_date = indexes.DateTimeField(model_attr="pub_date")
+
+    def get_model(self):
+        return MockModel
+
+
+class TypedMockSearchIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, model_attr="foo")
+    name = indexes.CharField(model_attr="author")
+    number = indexes.IntegerField(model_attr="id")
+    even = indexes.BooleanField()
+    parity = indexes.MultiValueField()
+    pub_date = indexes.DateTimeField(model_attr="pub_date")
+
+    def get_model(self):
+        return MockModel
+
+    def prepare_even(self, obj):
+        return obj.pk % 2 == 0
+
+    def prepare_parity(self, obj):
+        return ["even" if obj.pk % 2 == 0 else "odd", "any"]
+
+
+class AutocompleteMockSearchIndex(indexes.SearchIndex, indexes.Indexable):
+    text = indexes.CharField(document=True, model_attr="foo")
+    name = indexes.CharField(model_attr="author")
+    name_auto = indexes.EdgeNgramField(model_attr="author")
+
+    def get_model(self):
+        return MockModel
+
+
 class SimpleMockScoreIndex(indexes.SearchIndex, indexes.Indexable):
     text = indexes.CharField(document=True, model_attr="score")
     score = indexes.CharField(model_attr="score")
@@ -1,39 +1,161 @@
-from datetime import date
+import pickle
+from datetime import date, datetime
+from io import StringIO
+from unittest import mock
 
-from django.test import TestCase
-from django.test.utils import override_settings
-from haystack import connections
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import NotSupportedError, connection, transaction
+from django.db.migrations.state import ProjectState
+from django.db.models import Index, Q, TextField, UniqueConstraint
+from django.db.models.functions import Cast
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from haystack import connection_router, connections
+from haystack.exceptions import SearchBackendError
+from haystack.models import SearchResult
 from haystack.query import SearchQuerySet
 from haystack.utils.loading import UnifiedIndex
 
-from tests.core.models import MockModel
+from postgres_fts_backend import CompactSearchResult, PostgresFTSSearchQuerySet
+from postgres_fts_backend.models import IndexUpdate, Lexeme, SearchDocument
+from postgres_fts_backend.operations import (
+    AddSearchIndexes,
+    check_queries,
+    missing_indexes,
+    model_indexes,
+)
+from postgres_fts_backend.queue import process_queue
+from postgres_fts_backend.signals import QueuedSignalProcessor, search_executed
+from tests.core.models import AnotherMockModel, MockModel, MockTag, UUIDMockModel
 
 from .mocks import MockSearchResult
-from .search_indexes import SimpleMockSearchIndex
+from .search_indexes import (
+    AutocompleteMockSearchIndex,
+    BoostMockSearchIndex,
+    ConfigMockSearchIndex,
+    SimpleMockSearchIndex,
+    SimpleMockUUIDModelIndex,
+    TypedMockSearchIndex,
+)
 
 
-class SimpleSearchBackendTestCase(TestCase):
+class IndexedMockModelMixin:
+    """
+    Swaps in a ``UnifiedIndex`` holding an ``index_class`` index for the
+    length of each test, and indexes every ``MockModel`` with it.
+    """
+
     fixtures = ["base_data.json", "bulk_data.json"]
+    index_class = SimpleMockSearchIndex
 
     def setUp(self):
         super().setUp()
 
         self.backend = connections["default"].get_backend()
-        ui = connections["default"].get_unified_index()
-        self.index = SimpleMockSearchIndex()
-        ui.build(indexes=[self.index])
-        self.sample_objs = MockModel.objects.all()
+        self.old_ui = connections["default"].get_unified_index()
+        self.ui = UnifiedIndex()
+        self.index = self.index_class()
+        self.ui.build(indexes=[self.index])
+        connections["default"]._index = self.ui
 
+        self.sample_objs = MockModel.objects.order_by("pk")
+        self.backend.update(self.index, self.sample_objs)
         self.sqs = SearchQuerySet(using="default")
 
+    def tearDown(self):
+        connections["default"]._index = self.old_ui
+        super().tearDown()
+
+
+class SimpleSearchBackendTestCase(IndexedMockModelMixin, TestCase):
     def test_update(self):
-        self.backend.update(self.index, self.sample_objs)
+        self.assertEqual(SearchDocument.objects.count(), 23)
+
+        document = SearchDocument.objects.get(django_ct="core.mockmodel", django_id="1")
+        self.assertEqual(document.text, self.sample_objs.get(pk=1).foo)
+        self.assertEqual(document.data["name"], "daniel1")
+
+        # Updating again overwrites rather than duplicates.
+        obj = self.sample_objs.get(pk=1)
+        obj.foo = "Rewritten"
+        self.backend.update(self.index, [obj])
+        self.assertEqual(SearchDocument.objects.count(), 23)
+        self.assertEqual(
+            [
+                result.pk
+                for result in self.backend.search(
+                    self.sqs.auto_query("rewritten").query.build_query()
+                )["results"]
+            ],
+            [1],
+        )
+
+    def test_update_batches(self):
+        self.backend.clear()
+
+        with mock.patch.object(self.backend, "batch_size", 10):
+            # One streamed SELECT plus one upsert per batch of ten.
+            with self.assertNumQueries(4):
+                self.backend.update(self.index, self.sample_objs)
+
+            objs = list(self.sample_objs)
+            with self.assertNumQueries(3):
+                self.backend.update(self.index, objs)
+
+        self.assertEqual(SearchDocument.objects.count(), 23)
+
+    def test_update_duplicates(self):
+        # The same object twice in one batch is written once, as last seen.
+        first = self.sample_objs.get(pk=1)
+        last = self.sample_objs.get(pk=1)
+        last.foo = "Rewritten"
+        self.backend.update(self.index, [first, self.sample_objs.get(pk=2), last])
+
+        self.assertEqual(SearchDocument.objects.count(), 23)
+        self.assertEqual(
+            SearchDocument.objects.get(django_ct="core.mockmodel", django_id="1").text,
+            "Rewritten",
+        )
 
     def test_remove(self):
         self.backend.remove(self.sample_objs[0])
+        self.assertEqual(SearchDocument.objects.count(), 22)
+        self.assertEqual(self.backend.search(self.sqs.query.build_query())["hits"], 22)
+
+        self.backend.remove("core.mockmodel.2")
+        self.assertEqual(SearchDocument.objects.count(), 21)
+
+    def test_update_index_remove(self):
+        self.assertEqual(
+            list(self.sqs.order_by("pk").values_list("pk", "id")[:2]),
+            [[1, "core.mockmodel.1"], [2, "core.mockmodel.2"]],
+        )
+        self.assertEqual(
+            self.sqs.result_class(SearchResult).order_by("pk")[0].id,
+            "core.mockmodel.1",
+        )
+
+        # Documents of objects that are gone are found by their ``id``.
+        MockModel.objects.filter(pk__in=[1, 2]).delete()
+        call_command("update_index", "core", remove=True, verbosity=0)
+        self.assertEqual(SearchDocument.objects.count(), 21)
+        self.assertFalse(SearchDocument.objects.filter(django_id__in=["1", "2"]))
 
     def test_clear(self):
+        self.backend.clear(models=[AnotherMockModel])
+        self.assertEqual(SearchDocument.objects.count(), 23)
+
+        self.backend.clear(models=[MockModel])
+        self.assertEqual(SearchDocument.objects.count(), 0)
+
+        self.backend.update(self.index, self.sample_objs)
         self.backend.clear()
+        self.assertEqual(self.backend.search(self.sqs.query.build_query())["hits"], 0)
 
     def test_search(self):
         # No query string should always yield zero results.
@@ -94,7 +216,7 @@ class SimpleSearchBackendTestCase(TestCase):
             [8],
         )
         # Ensure the results are ``SearchResult`` instances...
-        self.assertEqual(
+        self.assertGreater(
             self.backend.search(
                 self.sqs.auto_query("should be a string").query.build_query()
             )["results"][0].score,
@@ -114,7 +236,7 @@ class SimpleSearchBackendTestCase(TestCase):
                     self.sqs.auto_query("index document").query.build_query()
                 )["results"]
             ],
-            [2, 3, 15, 17, 18],
+            [17, 2, 3, 18, 15],
         )
 
         self.assertEqual(
@@ -134,7 +256,7 @@ class SimpleSearchBackendTestCase(TestCase):
                     self.sqs.auto_query("here SearchIndex get").query.build_query()
                 )["results"]
             ],
-            [3, 22, 23],
+            [23, 22, 3],
         )
 
         self.assertEqual(
@@ -155,28 +277,28 @@ class SimpleSearchBackendTestCase(TestCase):
                 )["results"]
             ],
             [
-                1,
-                2,
+                22,
                 3,
+                6,
+                1,
                 4,
+                12,
+                13,
+                14,
+                18,
+                19,
+                20,
+                2,
                 5,
-                6,
                 7,
                 8,
                 9,
                 10,
                 11,
-                12,
-                13,
-                14,
                 15,
                 16,
                 17,
-                18,
-                19,
-                20,
                 21,
-                22,
             ],
         )
 
@@ -200,7 +322,7 @@ class SimpleSearchBackendTestCase(TestCase):
                     self.sqs.auto_query("index document").query.build_query()
                 )["results"]
             ],
-            [2, 3, 15, 17, 18],
+            [17, 2, 3, 18, 15],
         )
         self.assertEqual(
             self.backend.search(
@@ -209,7 +331,7 @@ class SimpleSearchBackendTestCase(TestCase):
             MockModel,
         )
 
-        # No support for spelling suggestions
+        # Spelling suggestions are off unless INCLUDE_SPELLING is set.
         self.assertEqual(
             self.backend.search(self.sqs.auto_query("Indx").query.build_query())[
                 "hits"
@@ -222,12 +344,15 @@ class SimpleSearchBackendTestCase(TestCase):
             )
         )
 
-        # No support for facets
         self.assertEqual(
             self.backend.search(
                 self.sqs.auto_query("").query.build_query(), facets=["name"]
             ),
-            {"hits": 0, "results": []},
+            {
+                "hits": 0,
+                "results": [],
+                "facets": {"fields": {"name": []}, "dates": {}, "queries": {}},
+            },
         )
         self.assertEqual(
             self.backend.search(
@@ -247,7 +372,11 @@ class SimpleSearchBackendTestCase(TestCase):
                     }
                 },
             ),
-            {"hits": 0, "results": []},
+            {
+                "hits": 0,
+                "results": [],
+                "facets": {"fields": {}, "dates": {"pub_date": []}, "queries": {}},
+            },
         )
         self.assertEqual(
             self.backend.search(
@@ -267,7 +396,11 @@ class SimpleSearchBackendTestCase(TestCase):
                 self.sqs.auto_query("").query.build_query(),
                 query_facets={"name": "[* TO e]"},
             ),
-            {"hits": 0, "results": []},
+            {
+                "hits": 0,
+                "results": [],
+                "facets": {"fields": {}, "dates": {}, "queries": {"name:[* TO e]": 0}},
+            },
         )
         self.assertEqual(
             self.backend.search(
@@ -312,6 +445,399 @@ class SimpleSearchBackendTestCase(TestCase):
             {"hits": 0, "results": []},
         )
 
+    def test_search_offsets(self):
+        query = self.sqs.query.build_query()
+
+        with self.assertNumQueries(2):
+            page = self.backend.search(query, start_offset=5, end_offset=10)
+        self.assertEqual(page["hits"], 23)
+        self.assertEqual([result.pk for result in page["results"]], [6, 7, 8, 9, 10])
+
+        self.assertEqual(
+            [
+                result.pk
+                for result in self.backend.search(query, start_offset=20)["results"]
+            ],
+            [21, 22, 23],
+        )
+
+        last = page["results"][-1]
+        page = self.backend.search(query, end_offset=3, search_after=last)
+        self.assertEqual(page["hits"], 23)
+        self.assertEqual([result.pk for result in page["results"]], [11, 12, 13])
+
+    def test_search_stored_fields(self):
+        query = self.sqs.auto_query("should be a string").query.build_query()
+        (result,) = self.backend.search(query)["results"]
+        self.assertEqual(result.name, "daniel2")
+        self.assertEqual(result.text, MockModel.objects.get(pk=8).foo)
+        self.assertIsInstance(result.pub_date, datetime)
+
+        (result,) = self.backend.search(query, fields=["name"])["results"]
+        self.assertEqual(result.name, "daniel2")
+        self.assertIsNone(result.text)
+
+        # Result classes that can't defer loading get their objects up front.
+        results = self.backend.search(query, result_class=MockSearchResult)["results"]
+        with self.assertNumQueries(0):
+            self.assertEqual(results[0].object.pk, 8)
+
+    def test_compact_results(self):
+        query = self.sqs.auto_query("should be a string").query.build_query()
+        (result,) = self.backend.search(query)["results"]
+
+        self.assertIsInstance(result, CompactSearchResult)
+        self.assertFalse(hasattr(result, "__dict__"))
+        self.assertEqual(result.model, MockModel)
+        self.assertEqual(result.name, "daniel2")
+        self.assertIsNone(result.missing)
+        self.assertEqual(
+            sorted(result.get_stored_fields()), ["name", "pub_date", "text"]
+        )
+        self.assertEqual(result.get_additional_fields()["name"], "daniel2")
+        self.assertEqual(result.object.pk, 8)
+        self.assertEqual(result.content_type(), "core.mockmodel")
+
+        result = pickle.loads(pickle.dumps(result))
+        self.assertEqual(result.name, "daniel2")
+        self.assertEqual(result.object.pk, 8)
+
+    def test_search_ranking(self):
+        query = self.sqs.auto_query("index").query.build_query()
+        results = self.backend.search(query)["results"]
+        scores = [result.score for result in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertGreater(scores[0], scores[-1])
+
+        page = self.backend.search(query, end_offset=3)["results"]
+        self.assertEqual(
+            [result.pk for result in page], [result.pk for result in results[:3]]
+        )
+
+        page = self.backend.search(query, end_offset=3, search_after=page[-1])
+        self.assertEqual(
+            [result.pk for result in page["results"]],
+            [result.pk for result in results[3:6]],
+        )
+
+        # Match-all queries aren't ranked.
+        self.assertEqual(
+            self.backend.search(self.sqs.query.build_query())["results"][0].score, 0
+        )
+
+    def test_search_boost(self):
+        query = self.sqs.auto_query("index").query.build_query()
+        results = self.backend.search(query)["results"]
+        boosted = self.backend.search(query, boost={"template": 10})["results"]
+
+        self.assertEqual(len(boosted), len(results))
+        self.assertIn("template", boosted[0].text.lower())
+        self.assertNotIn("template", results[0].text.lower())
+
+    def test_search_facets(self):
+        query = self.sqs.auto_query("index documents").query.build_query()
+
+        # The hits and every facet come from one query besides the page's.
+        with self.assertNumQueries(2):
+            results = self.backend.search(
+                query,
+                facets={"name": {}},
+                date_facets={
+                    "pub_date": {
+                        "start_date": date(2009, 1, 1),
+                        "end_date": date(2010, 1, 1),
+                        "gap_by": "month",
+                        "gap_amount": 1,
+                    }
+                },
+                query_facets=[("name", "[* TO daniel2]"), ("text", "index")],
+            )
+
+        self.assertEqual(results["hits"], 5)
+        self.assertEqual(
+            results["facets"],
+            {
+                "fields": {"name": [("daniel2", 2), ("daniel3", 2), ("daniel1", 1)]},
+                "dates": {
+                    "pub_date": [
+                        (timezone.make_aware(datetime(2009, 6, 1)), 1),
+                        (timezone.make_aware(datetime(2009, 7, 1)), 4),
+                    ]
+                },
+                "queries": {"name:[* TO daniel2]": 3, "text:index": 5},
+            },
+        )
+
+        self.assertEqual(
+            self.backend.search(query, facets={"name": {"limit": 1}})["facets"][
+                "fields"
+            ],
+            {"name": [("daniel2", 2)]},
+        )
+        self.assertEqual(
+            self.backend.search(
+                query,
+                date_facets={
+                    "pub_date": {
+                        "start_date": date(2009, 1, 1),
+                        "end_date": date(2010, 1, 1),
+                        "gap_by": "month",
+                        "gap_amount": 3,
+                    }
+                },
+            )["facets"]["dates"],
+            {
+                "pub_date": [
+                    (timezone.make_aware(datetime(2009, 4, 1)), 1),
+                    (timezone.make_aware(datetime(2009, 7, 1)), 4),
+                ]
+            },
+        )
+
+        facet_counts = (
+            self.sqs.auto_query("index documents")
+            .facet("name")
+            .query_facet("name", "daniel1")
+            .facet_counts()
+        )
+        self.assertEqual(
+            facet_counts["fields"]["name"],
+            [("daniel2", 2), ("daniel3", 2), ("daniel1", 1)],
+        )
+        self.assertEqual(facet_counts["queries"], {"name:daniel1": 1})
+
+    def test_search_highlight(self):
+        query = self.sqs.auto_query("index documents").query.build_query()
+        results = self.backend.search(
+            query,
+            highlight={"start_sel": "<b>", "stop_sel": "</b>"},
+            end_offset=2,
+        )["results"]
+
+        self.assertEqual([result.pk for result in results], [17, 2])
+        self.assertEqual(
+            results[1].highlighted,
+            {
+                "text": [
+                    "<b>document</b>. In this case, we also <b>index</b> the user"
+                    " who authored the <b>document</b> as well"
+                ]
+            },
+        )
+
+        results = self.sqs.auto_query("index").result_class(MockSearchResult)
+        self.assertIn("<b>indexes</b>", results.highlight()[0].highlighted["text"][0])
+        self.assertIsNone(results[0].highlighted)
+
+    def test_search_sort_by(self):
+        results = self.backend.search(
+            self.sqs.query.build_query(), sort_by=["-pub_date"]
+        )["results"]
+        pub_dates = [result.pub_date for result in results]
+        self.assertEqual(pub_dates, sorted(pub_dates, reverse=True))
+
+    def test_stream(self):
+        query = self.sqs.auto_query("index").query.build_query()
+        results = self.backend.search(query)["results"]
+
+        streamed = list(self.backend.stream(query, chunk_size=5))
+        self.assertEqual(
+            [result.pk for result in streamed], [result.pk for result in results]
+        )
+        self.assertEqual(
+            [result.score for result in streamed],
+            [result.score for result in results],
+        )
+
+        # Objects are loaded a chunk at a time.
+        with self.assertNumQueries(1):
+            [result.object for result in streamed[:5]]
+
+        self.assertEqual(
+            [
+                result.pk
+                for result in self.backend.stream(
+                    query, chunk_size=5, start_offset=2, end_offset=4
+                )
+            ],
+            [result.pk for result in results[2:4]],
+        )
+
+    def test_count_cache(self):
+        query = self.sqs.auto_query("index").query.build_query()
+        self.addCleanup(caches["default"].clear)
+
+        with mock.patch.object(self.backend, "count_cache_timeout", 60):
+            hits = self.backend.search(query, end_offset=1)["hits"]
+
+            with self.assertNumQueries(1):
+                self.assertEqual(self.backend.search(query, end_offset=1)["hits"], hits)
+
+    def test_spelling_suggestion(self):
+        with mock.patch.object(self.backend, "include_spelling", True):
+            with CaptureQueriesContext(connection) as queries:
+                self.backend.update(self.index, self.sample_objs)
+            self.assertEqual(Lexeme.objects.get(word="index").ndoc, 14)
+
+            # Lexemes are upserted in a fixed order, so concurrent batches
+            # lock shared rows in the same order rather than deadlocking.
+            (upsert,) = [query["sql"] for query in queries if "ts_stat" in query["sql"]]
+            self.assertIn("ORDER BY word ON CONFLICT", upsert)
+
+            results = self.backend.search(
+                self.sqs.auto_query("Indx").query.build_query()
+            )
+            self.assertEqual(results["hits"], 0)
+            self.assertEqual(results["spelling_suggestion"], "index")
+
+            results = self.backend.search(
+                self.sqs.auto_query("the indx documnts").query.build_query()
+            )
+            self.assertEqual(results["spelling_suggestion"], "the index document")
+            self.assertIsNone(
+                self.backend.search(
+                    self.sqs.auto_query("index documents").query.build_query()
+                )["spelling_suggestion"]
+            )
+            self.assertEqual(
+                self.sqs.auto_query("Indx").spelling_suggestion("serch"), "search"
+            )
+
+            self.backend.remove(self.sample_objs[0])
+            self.backend.refresh_lexemes()
+            self.assertEqual(Lexeme.objects.get(word="index").ndoc, 13)
+
+            self.backend.clear()
+            self.assertFalse(Lexeme.objects.exists())
+
+    def test_fuzzy_fallback(self):
+        with mock.patch.object(self.backend, "fuzzy_fallback", True):
+            self.backend.update(self.index, self.sample_objs)
+
+            results = self.backend.search(
+                self.sqs.auto_query("indx documnts").query.build_query()
+            )
+            self.assertEqual(results["hits"], 5)
+            self.assertEqual(
+                [result.pk for result in results["results"]],
+                [
+                    result.pk
+                    for result in self.backend.search(
+                        self.sqs.auto_query("index document").query.build_query()
+                    )["results"]
+                ],
+            )
+            self.assertNotIn("spelling_suggestion", results)
+
+            # Queries that match as they are aren't rewritten.
+            with self.assertNumQueries(2):
+                self.backend.search(self.sqs.auto_query("index").query.build_query())
+
+    def test_default_config(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW default_text_search_config")
+            (default,) = cursor.fetchone()
+
+        # With no CONFIG or analyzer, filters on model columns still name the
+        # configuration, as the expression indexes over them must.
+        _, rows = self.backend.build_search_querysets(
+            self.sqs.filter(name="daniel1").query.build_query()
+        )
+        sql = str(rows.query)
+        self.assertIn(f"to_tsvector({default}::regconfig, COALESCE(", sql)
+        self.assertNotIn("to_tsvector(COALESCE(", sql)
+
+    def test_result_cache(self):
+        query = self.sqs.auto_query("index").query.build_query()
+        self.addCleanup(caches["default"].clear)
+
+        with mock.patch.object(self.backend, "result_cache_timeout", 60):
+            page = self.backend.search(query, end_offset=5)
+
+            with self.assertNumQueries(0):
+                cached = self.backend.search(query, end_offset=5)
+
+            self.assertEqual(cached["hits"], page["hits"])
+            self.assertEqual(
+                [(result.pk, result.score) for result in cached["results"]],
+                [(result.pk, result.score) for result in page["results"]],
+            )
+
+            # Other pages are cached separately.
+            with self.assertNumQueries(2):
+                self.backend.search(query, start_offset=5, end_offset=10)
+
+            # As are the same page's facets.
+            faceted = self.backend.search(query, end_offset=5, facets={"name": {}})
+            self.assertEqual(
+                sum(count for _, count in faceted["facets"]["fields"]["name"]),
+                page["hits"],
+            )
+            self.assertNotIn("facets", self.backend.search(query, end_offset=5))
+
+            # Writes through the backend invalidate cached results.
+            self.backend.remove(page["results"][0].object)
+            page = self.backend.search(query, end_offset=5)
+            self.assertEqual(page["hits"], cached["hits"] - 1)
+
+            self.backend.clear()
+            self.assertEqual(self.backend.search(query, end_offset=5)["hits"], 0)
+
+    def test_search_executed(self):
+        sent = []
+
+        def receiver(sender, **kwargs):
+            sent.append(kwargs)
+
+        search_executed.connect(receiver)
+        try:
+            results = list(self.sqs.auto_query("index")[:5])
+        finally:
+            search_executed.disconnect(receiver)
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(set(sent[0]["timings"]), {"build", "count", "sql", "hydrate"})
+        self.assertEqual(sent[0]["using"], "default")
+        self.assertEqual(sent[0]["hits"], 14)
+        self.assertEqual(sent[0]["rows"], 5)
+        self.assertFalse(sent[0]["cached"])
+        self.assertIn("websearch_to_tsquery", sent[0]["sql"])
+        self.assertIn("index", sent[0]["params"])
+
+    def test_slow_query_log(self):
+        query = self.sqs.auto_query("index").query.build_query()
+
+        with mock.patch.object(self.backend, "slow_query_threshold", 0):
+            with self.assertLogs("haystack", "WARNING") as logs:
+                self.backend.search(query, end_offset=5)
+
+        # Each query over the threshold is logged with its own plan.
+        count, page = logs.output
+        self.assertIn("Slow search count query", count)
+        self.assertIn("Aggregate", count)
+        self.assertIn("Slow search page query", page)
+        self.assertIn("Limit", page)
+        self.assertIn("actual time", page)
+        self.assertIn("Buffers", page)
+
+        with mock.patch.object(self.backend, "slow_query_threshold", 0):
+            with self.assertLogs("haystack", "WARNING") as logs:
+                self.backend.search(query, end_offset=5, facets={"name": {}})
+
+        self.assertIn("Slow search count query", logs.output[0])
+        self.assertIn("MixedAggregate", logs.output[0])
+
+    def test_estimated_count(self):
+        query = self.sqs.query.build_query()
+
+        with mock.patch.object(self.backend, "estimate_count_threshold", 0):
+            with self.assertNumQueries(2):
+                hits = self.backend.search(query, end_offset=1)["hits"]
+
+        self.assertIsInstance(hits, int)
+        self.assertGreater(hits, 0)
+
     def test_filter_models(self):
         self.backend.update(self.index, self.sample_objs)
         self.assertEqual(
@@ -329,32 +855,535 @@ class SimpleSearchBackendTestCase(TestCase):
         self.backend.update(self.index, self.sample_objs)
         self.assertEqual(self.backend.search(self.sqs.query.build_query())["hits"], 23)
 
-        # Unsupported by 'simple'. Should see empty results.
-        self.assertEqual(self.backend.more_like_this(self.sample_objs[0])["hits"], 0)
+        source = self.sample_objs[0]
+        results = self.backend.more_like_this(source)
+        self.assertEqual(results["hits"], 21)
+        self.assertNotIn(source.pk, [result.pk for result in results["results"]])
+        self.assertEqual([result.pk for result in results["results"][:3]], [14, 12, 6])
+        scores = [result.score for result in results["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
 
+        page = self.backend.more_like_this(source, start_offset=1, end_offset=3)
+        self.assertEqual(page["hits"], 21)
+        self.assertEqual([result.pk for result in page["results"]], [12, 6])
 
-@override_settings(DEBUG=True)
-class LiveSimpleSearchQuerySetTestCase(TestCase):
-    fixtures = ["base_data.json", "bulk_data.json"]
+        # The source is found through its stored vector, in one query.
+        with self.assertNumQueries(2):
+            self.backend.more_like_this(source, end_offset=5)
 
-    def setUp(self):
-        super().setUp()
+        self.assertEqual(
+            self.backend.more_like_this(source, models=[AnotherMockModel])["hits"], 0
+        )
 
-        # Stow.
-        self.old_ui = connections["default"].get_unified_index()
-        self.ui = UnifiedIndex()
-        self.smmi = SimpleMockSearchIndex()
-        self.ui.build(indexes=[self.smmi])
-        connections["default"]._index = self.ui
 
-        self.sample_objs = MockModel.objects.all()
-        self.sqs = SearchQuerySet(using="default")
+class TypedFacetSearchBackendTestCase(IndexedMockModelMixin, TestCase):
+    index_class = TypedMockSearchIndex
+
+    def test_query_facets(self):
+        query = self.sqs.query.build_query()
+        facets = self.backend.search(
+            query,
+            end_offset=1,
+            query_facets=[
+                ("number", "[1 TO 5]"),
+                ("number", "[10 TO *]"),
+                ("number", "5"),
+                ("even", "true"),
+                ("pub_date", "[2009-07-01 TO *]"),
+            ],
+        )["facets"]["queries"]
+
+        self.assertEqual(
+            facets,
+            {
+                "number:[1 TO 5]": 5,
+                "number:[10 TO *]": 14,
+                "number:5": 1,
+                "even:true": 11,
+                "pub_date:[2009-07-01 TO *]": MockModel.objects.filter(
+                    pub_date__gte=timezone.make_aware(datetime(2009, 7, 1))
+                ).count(),
+            },
+        )
+
+    def test_prepared_field_filters(self):
+        # Fields without a model field behind them filter on their prepared
+        # values.
+        even = MockModel.objects.filter(pk__in=range(0, 100, 2)).count()
+        total = MockModel.objects.count()
+
+        self.assertEqual(self.sqs.filter(even=True).count(), even)
+        self.assertEqual(self.sqs.filter(even=False).count(), total - even)
+        self.assertEqual(self.sqs.filter(parity="odd").count(), total - even)
+        self.assertEqual(self.sqs.filter(parity__exact="even").count(), even)
+        self.assertEqual(self.sqs.filter(parity__in=["odd", "even"]).count(), total)
+        self.assertEqual(self.sqs.filter(parity__in=[]).count(), 0)
+        self.assertEqual(self.sqs.filter(even=True, parity__exact="odd").count(), 0)
+
+    def test_invalid_query_facets(self):
+        query = self.sqs.query.build_query()
+
+        for field, facet_query in [
+            ("number", "abc"),
+            ("number", "[1 TO five]"),
+            ("even", "yes"),
+            ("pub_date", "[NOW-1YEAR TO *]"),
+        ]:
+            with self.subTest(field=field, facet_query=facet_query):
+                with self.assertRaisesMessage(
+                    SearchBackendError, f"Can't query the '{field}' facet"
+                ):
+                    self.backend.search(
+                        query, end_offset=1, query_facets=[(field, facet_query)]
+                    )
+
+
+class AutocompleteSearchBackendTestCase(IndexedMockModelMixin, TestCase):
+    index_class = AutocompleteMockSearchIndex
+
+    def test_autocomplete(self):
+        results = self.sqs.autocomplete(name_auto="daniel3")
+        self.assertEqual(
+            sorted(result.pk for result in results),
+            list(
+                MockModel.objects.filter(author="daniel3")
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            ),
+        )
+        self.assertEqual(self.sqs.autocomplete(name_auto="dan").count(), 23)
+        self.assertEqual(self.sqs.autocomplete(name_auto="xyz").count(), 0)
+
+        # Only the n-gram field's own words match, not the document's.
+        self.assertEqual(self.sqs.autocomplete(name_auto="inde").count(), 0)
+        self.assertEqual(self.sqs.autocomplete(name_auto="dan inde").count(), 0)
+        self.assertEqual(self.sqs.autocomplete(name_auto="daniel dan").count(), 23)
+
+    def test_ngram_label(self):
+        labels, weights = self.backend.weights()
+        self.assertEqual(labels[1.0], "D")
+        self.assertEqual(weights, [1.0, 1.0, 1.0, 1.0])
+
+        vector = SearchDocument.objects.filter(
+            django_ct="core.mockmodel", django_id="1"
+        ).values_list(Cast("vector", TextField()), flat=True)[0]
+        self.assertRegex(vector, r"'daniel1':\d+A")
+        self.assertNotRegex(vector, r"'index':[\d,]*\d+A")
+
+    def test_content_skips_ngrams(self):
+        # Author names are only in the n-gram field, so content searches
+        # don't find them, while autocompletion does.
+        self.assertFalse(MockModel.objects.filter(foo__icontains="daniel1"))
+        self.assertEqual(self.sqs.auto_query("daniel1").count(), 0)
+        self.assertEqual(self.sqs.filter(content="daniel1").count(), 0)
+        self.assertEqual(self.sqs.filter(content__startswith="dan").count(), 0)
+        self.assertGreater(self.sqs.autocomplete(name_auto="daniel1").count(), 0)
+
+        # Words of the document still match, and are ranked.
+        results = list(self.sqs.auto_query("index")[:3])
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(result.score > 0 for result in results))
+
+    def test_startswith(self):
+        self.assertEqual(
+            self.sqs.filter(content__startswith="inde").count(),
+            self.sqs.filter(content="index").count(),
+        )
+        self.assertGreater(
+            self.sqs.filter(content__startswith="search").count(),
+            self.sqs.filter(content="search").count(),
+        )
+        self.assertEqual(self.sqs.filter(content__startswith="'):*").count(), 0)
+
+
+class ConfigSearchBackendTestCase(IndexedMockModelMixin, TestCase):
+    index_class = ConfigMockSearchIndex
+
+    def test_configs(self):
+        self.assertEqual(self.backend.configs(), ["english", "simple"])
+        self.assertEqual(
+            self.backend.search_config(self.index.fields["name"]), "simple"
+        )
+
+        # Other fields are parsed with CONFIG or, when it's unset, the
+        # database's default, which is named explicitly either way.
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW default_text_search_config")
+            (default,) = cursor.fetchone()
+        self.assertEqual(
+            self.backend.search_config(self.index.fields["pub_date"]), default
+        )
+
+        backend = type(self.backend)("default", CONFIG="french")
+        self.assertEqual(backend.search_config(self.index.fields["pub_date"]), "french")
+
+    def test_document_config(self):
+        self.assertEqual(self.backend.document_config(), "english")
+
+        # The highlight parses the document text as the document field was.
+        query = self.sqs.auto_query("documents").query.build_query()
+        _, rows = self.backend.build_search_querysets(query, highlight=True)
+        self.assertIn('ts_headline(english::regconfig, "postgres_fts', str(rows.query))
+
+        # As do spelling suggestions, whatever the database's default.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL default_text_search_config = 'simple'")
+        self.backend.update_lexemes("core.mockmodel", ["1", "2", "3"])
+        self.assertEqual(
+            self.backend.spelling_corrections("indexes documents indx"),
+            {"indx": "index"},
+        )
+
+    def test_stored_vector(self):
+        vector = SearchDocument.objects.filter(
+            django_ct="core.mockmodel", django_id="1"
+        ).values_list(Cast("vector", TextField()), flat=True)[0]
+        self.assertRegex(vector, r"'daniel1':\d+C")
+        self.assertNotIn("'indexes'", vector)
+        self.assertIn("'index'", vector)
+
+    def test_search(self):
+        query = self.sqs.auto_query("documents").query.build_query()
+        sql = str(SearchDocument.objects.filter(query).query)
+        self.assertIn("websearch_to_tsquery(english::regconfig, documents)", sql)
+        self.assertIn("websearch_to_tsquery(simple::regconfig, documents)", sql)
+        self.assertEqual(self.backend.search(query)["hits"], 6)
+
+    def test_model_filter_matches_expression_index(self):
+        index = GinIndex(
+            SearchVector("author", config="simple"), name="mock_author_fts"
+        )
+
+        with connection.schema_editor() as editor:
+            editor.add_index(MockModel, index)
+
+        query = self.sqs.filter(name="daniel1").query.build_query()
+        self.assertEqual(self.backend.search(query)["hits"], 7)
+
+        # The filter is written exactly as the index expression, so the
+        # planner can use the index for it.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_get_indexdef(%s::regclass, 1, false)", ["mock_author_fts"]
+            )
+            (expression,) = cursor.fetchone()
+
+        self.assertIn(expression, SearchDocument.objects.filter(query).explain())
+
+
+class ParallelSearchBackendTestCase(IndexedMockModelMixin, TransactionTestCase):
+    # Pooled connections only see committed data, so this runs outside a
+    # test transaction.
+    available_apps = ["postgres_fts_backend", "tests.core"]
+
+    def test_parallel_queries(self):
+        query = self.sqs.auto_query("index").query.build_query()
+        facets = {"name": {}}
+        serial = self.backend.search(query, end_offset=5, facets=facets)
+
+        with mock.patch.object(self.backend, "parallel_queries", True):
+            # Only the page is fetched on this thread's connection.
+            with self.assertNumQueries(1):
+                parallel = self.backend.search(query, end_offset=5, facets=facets)
+
+            with transaction.atomic(), self.assertNumQueries(2):
+                self.backend.search(query, end_offset=5)
+
+        self.assertEqual(parallel["hits"], serial["hits"])
+        self.assertEqual(parallel["facets"], serial["facets"])
+        self.assertEqual(
+            [result.pk for result in parallel["results"]],
+            [result.pk for result in serial["results"]],
+        )
+
+
+class QueuedSignalProcessorTestCase(IndexedMockModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.processor = QueuedSignalProcessor(connections, connection_router)
 
     def tearDown(self):
-        # Restore.
-        connections["default"]._index = self.old_ui
+        self.processor.teardown()
         super().tearDown()
 
+    def test_enqueue(self):
+        obj = MockModel.objects.get(pk=1)
+
+        with self.assertNumQueries(2):
+            obj.save()
+
+        self.assertEqual(
+            list(IndexUpdate.objects.values_list("using", "django_ct", "django_id")),
+            [("default", "core.mockmodel", "1")],
+        )
+
+        # Unindexed models aren't queued.
+        MockTag.objects.create(name="tertiary")
+        self.assertEqual(IndexUpdate.objects.count(), 1)
+
+    def test_process_queue(self):
+        changed = MockModel.objects.get(pk=1)
+        changed.author = "queued"
+        changed.save()
+        changed.save()
+        MockModel.objects.get(pk=2).delete()
+        added = MockModel.objects.create(
+            author="added", foo="queued document", tag_id=1
+        )
+
+        self.assertEqual(IndexUpdate.objects.count(), 4)
+        self.assertEqual(process_queue(batch_size=3), 3)
+        self.assertEqual(process_queue(), 1)
+        self.assertEqual(process_queue(), 0)
+
+        documents = SearchDocument.objects.filter(django_ct="core.mockmodel")
+        self.assertEqual(documents.get(django_id="1").data["name"], "queued")
+        self.assertFalse(documents.filter(django_id="2").exists())
+        self.assertTrue(documents.filter(django_id=str(added.pk)).exists())
+        self.assertEqual(
+            SearchQuerySet(using="default").auto_query("queued").count(), 1
+        )
+
+    def test_worker(self):
+        for obj in MockModel.objects.filter(pk__in=[1, 2]):
+            obj.delete()
+
+        call_command("fts_worker", "--once", "--batch-size", "1")
+
+        self.assertEqual(IndexUpdate.objects.count(), 0)
+        self.assertFalse(
+            SearchDocument.objects.filter(django_id__in=["1", "2"]).exists()
+        )
+
+
+class ModelIndexesTestCase(IndexedMockModelMixin, TestCase):
+    index_class = ConfigMockSearchIndex
+
+    def test_model_indexes(self):
+        indexes = [
+            (model, name, type(index).__name__, index.fields or index.expressions)
+            for model, name, index in model_indexes()
+        ]
+        self.assertEqual(
+            indexes,
+            [
+                (MockModel, "name", "Index", ["author"]),
+                (
+                    MockModel,
+                    "name",
+                    "GinIndex",
+                    (SearchVector("author", config="simple"),),
+                ),
+                (MockModel, "pub_date", "Index", ["pub_date"]),
+            ],
+        )
+        self.assertEqual(missing_indexes(), model_indexes())
+
+    def test_command_sql(self):
+        out = StringIO()
+        call_command("fts_indexes", "--concurrently", stdout=out)
+        statements = out.getvalue().splitlines()
+
+        self.assertEqual(len(statements), 3)
+        self.assertTrue(
+            all(sql.startswith("CREATE INDEX CONCURRENTLY") for sql in statements)
+        )
+        self.assertIn("to_tsvector('simple'::regconfig", statements[1])
+        self.assertEqual(missing_indexes(), model_indexes())
+
+    def test_command_create(self):
+        call_command("fts_indexes", "--create", stdout=StringIO())
+        self.assertEqual(missing_indexes(), [])
+
+        out = StringIO()
+        call_command("fts_indexes", stdout=out)
+        self.assertEqual(out.getvalue(), "No indexes missing.\n")
+
+    def test_add_search_indexes(self):
+        operation = AddSearchIndexes()
+        state = ProjectState()
+        self.assertEqual(operation.describe(), "Create search filter indexes")
+
+        with connection.schema_editor() as editor:
+            operation.database_forwards("core", editor, state, state)
+        self.assertEqual(missing_indexes(), [])
+
+        # Running it again creates nothing.
+        with CaptureQueriesContext(connection) as queries:
+            with connection.schema_editor() as editor:
+                operation.database_forwards("core", editor, state, state)
+        self.assertFalse([query for query in queries if "CREATE INDEX" in query["sql"]])
+
+        with connection.schema_editor() as editor:
+            operation.database_backwards("core", editor, state, state)
+        self.assertEqual(missing_indexes(), model_indexes())
+
+        # Only the migration's own app's models get indexes.
+        with connection.schema_editor() as editor:
+            operation.database_forwards("postgres_fts_backend", editor, state, state)
+        self.assertEqual(missing_indexes(), model_indexes())
+
+    def test_add_search_indexes_concurrently(self):
+        operation = AddSearchIndexes(concurrently=True)
+        state = ProjectState()
+        message = "cannot be executed inside a transaction"
+
+        # Tests run in a transaction, as an atomic migration would.
+        with connection.schema_editor() as editor:
+            with self.assertRaisesMessage(NotSupportedError, message):
+                operation.database_forwards("core", editor, state, state)
+            with self.assertRaisesMessage(NotSupportedError, message):
+                operation.database_backwards("core", editor, state, state)
+
+        self.assertEqual(missing_indexes(), model_indexes())
+
+    def test_check(self):
+        # The document search is served by the stored vectors' GIN index;
+        # filters on the unindexed model attributes are not.
+        self.assertEqual(
+            check_queries(),
+            [
+                ("core.MockModel.name exact", ["core_mockmodel"]),
+                ("core.MockModel.name content", ["core_mockmodel"]),
+                ("core.MockModel.pub_date exact", ["core_mockmodel"]),
+            ],
+        )
+
+        err = StringIO()
+        with self.assertRaisesMessage(
+            CommandError, "3 queries need a sequential scan."
+        ):
+            call_command("fts_indexes", "--check", stdout=StringIO(), stderr=err)
+        self.assertIn("core.MockModel.name content", err.getvalue())
+
+    def test_declared_indexes(self):
+        # Indexes and unique constraints in the model's Meta that start with
+        # a column, or match the GIN expression, aren't suggested again.
+        indexes = [
+            Index(fields=["-author", "pub_date"], name="mockmodel_author_idx"),
+            GinIndex(SearchVector("author", config="simple"), name="mockmodel_fts"),
+        ]
+        constraints = [UniqueConstraint(fields=["pub_date"], name="mockmodel_uniq")]
+
+        with mock.patch.object(MockModel._meta, "indexes", indexes):
+            self.assertEqual(
+                [index.fields for _, _, index in model_indexes()], [["pub_date"]]
+            )
+
+            with mock.patch.object(MockModel._meta, "constraints", constraints):
+                self.assertEqual(model_indexes(), [])
+
+        # Partial indexes don't serve every filter.
+        partial = Index(
+            fields=["author"], name="mockmodel_partial", condition=Q(pk__gt=0)
+        )
+        with mock.patch.object(MockModel._meta, "indexes", [partial]):
+            self.assertEqual(len(model_indexes()), 3)
+
+
+class DefaultConfigModelIndexesTestCase(IndexedMockModelMixin, TestCase):
+    def test_create(self):
+        # With neither CONFIG nor an analyzer set, the GIN index names the
+        # database's default configuration; Postgres refuses to index
+        # to_tsvector() without one.
+        config = self.backend.default_config()
+        (gin,) = [
+            index for _, _, index in model_indexes() if isinstance(index, GinIndex)
+        ]
+        self.assertEqual(gin.expressions, (SearchVector("author", config=config),))
+
+        call_command("fts_indexes", "--create", stdout=StringIO())
+        self.assertEqual(missing_indexes(), [])
+
+        # Filters on the field evaluate the very expression it indexes.
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_get_indexdef(%s::regclass, 1, false)", [gin.name])
+            (expression,) = cursor.fetchone()
+        _, rows = self.backend.build_search_querysets(
+            self.sqs.filter(name="daniel1").query.build_query()
+        )
+        self.assertIn(f"{expression} @@", rows.explain())
+
+
+class BoostSearchBackendTestCase(IndexedMockModelMixin, TestCase):
+    index_class = BoostMockSearchIndex
+
+    def test_weights(self):
+        labels, weights = self.backend.weights()
+        self.assertEqual(labels[1.0], "D")
+        self.assertEqual(labels[2.0], "C")
+        self.assertEqual(weights, [0.5, 1.0, 1.0, 1.0])
+
+    def test_boosted_fields_are_weighted(self):
+        document = SearchDocument.objects.get(django_ct="core.mockmodel", django_id="1")
+        vector = SearchDocument.objects.filter(pk=document.pk).values_list(
+            Cast("vector", TextField()), flat=True
+        )[0]
+        self.assertIn("'daniel1':", vector)
+        self.assertRegex(vector, r"'daniel1':\d+C")
+
+        # Boosted fields take part in content searches.
+        results = self.backend.search(
+            self.sqs.auto_query("daniel3").query.build_query()
+        )["results"]
+        self.assertTrue(results)
+        self.assertTrue(all(result.name == "daniel3" for result in results))
+
+
+class MultiModelSearchBackendTestCase(IndexedMockModelMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.uuid_index = SimpleMockUUIDModelIndex()
+        self.ui.build(indexes=[self.index, self.uuid_index])
+        self.backend.update(self.uuid_index, UUIDMockModel.objects.all())
+
+    def test_search(self):
+        query = self.sqs.auto_query("indexed").query.build_query()
+
+        with self.assertNumQueries(2):
+            page = self.backend.search(query)
+
+        self.assertEqual(page["hits"], 16)
+        self.assertEqual(
+            {result.model for result in page["results"]}, {MockModel, UUIDMockModel}
+        )
+        scores = [result.score for result in page["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        # Objects are loaded for the whole page at once, one query per model.
+        with self.assertNumQueries(2):
+            self.assertTrue(
+                all(result.object is not None for result in page["results"])
+            )
+
+        page = self.backend.search(query, start_offset=1, end_offset=3)
+        self.assertEqual(page["hits"], 16)
+        self.assertEqual(len(page["results"]), 2)
+
+    def test_models(self):
+        query = self.sqs.auto_query("indexed").query.build_query()
+        page = self.backend.search(query, models={UUIDMockModel})
+        self.assertEqual(page["hits"], 2)
+        self.assertEqual(
+            sorted(str(result.pk) for result in page["results"]),
+            [
+                "53554c58-7051-4350-bcc9-dad75eb248a9",
+                "77554c58-7051-4350-bcc9-dad75eb24888",
+            ],
+        )
+
+    def test_search_queryset(self):
+        self.assertEqual(len(self.sqs.auto_query("indexed")), 16)
+        self.assertEqual(len(self.sqs.auto_query("indexed").models(UUIDMockModel)), 2)
+        self.assertEqual(
+            len(self.sqs.filter(name="daniel3")),
+            MockModel.objects.filter(author="daniel3").count(),
+        )
+
+
+@override_settings(DEBUG=True)
+class LiveSimpleSearchQuerySetTestCase(IndexedMockModelMixin, TestCase):
     def test_general_queries(self):
         # For now, just make sure these don't throw an exception.
         # They won't work until the simple backend is improved.
@@ -362,6 +1391,161 @@ class LiveSimpleSearchQuerySetTestCase(TestCase):
         self.assertTrue(len(self.sqs.exclude(name="daniel1")) > 0)
         self.assertTrue(len(self.sqs.order_by("-pub_date")) > 0)
 
+    def test_search_after(self):
+        sqs = PostgresFTSSearchQuerySet(using="default").auto_query("index")
+        first_page = list(sqs[:3])
+        second_page = list(sqs.search_after(first_page[-1])[:3])
+        self.assertEqual(
+            [result.pk for result in first_page + second_page],
+            [result.pk for result in sqs[:6]],
+        )
+
+    def test_iterator(self):
+        sqs = PostgresFTSSearchQuerySet(using="default").auto_query("index")
+        self.assertEqual(
+            [result.pk for result in sqs.iterator(chunk_size=4)],
+            [result.pk for result in sqs.all()],
+        )
+
+        sqs = sqs.all()
+        self.assertEqual(len(list(sqs.iterator())), sqs.count())
+        self.assertEqual(sqs._result_cache, [])
+
+    async def test_async(self):
+        # Haystack's connections are thread-local, and async tests run in
+        # a thread of their own.
+        connections["default"]._index = self.ui
+        sqs = PostgresFTSSearchQuerySet(using="default").auto_query("index")
+        expected = await sync_to_async(
+            lambda: [result.pk for result in sqs.all()[:5]]
+        )()
+        count = await sync_to_async(sqs.all().count)()
+
+        page = await sqs.aslice(0, 5)
+        self.assertEqual([result.pk for result in page], expected)
+        self.assertEqual(await sqs.all().acount(), count)
+        self.assertEqual([(await result.aget_object()).pk for result in page], expected)
+        self.assertEqual(len([result async for result in sqs.all()]), count)
+
+        page = await sqs.result_class(SearchResult).aslice(0, 2)
+        self.assertEqual([result.object.pk for result in page], expected[:2])
+
+        facets = await sqs.facet("name").afacet_counts()
+        self.assertEqual(sum(n for _, n in facets["fields"]["name"]), count)
+
+        obj = await MockModel.objects.aget(pk=1)
+        similar = await sqs.all().more_like_this(obj).aslice(0, 3)
+        self.assertNotIn(1, [result.pk for result in similar])
+
+        backend = connections["default"].get_backend()
+        with mock.patch.object(backend, "slow_query_threshold", 0):
+            with self.assertLogs("haystack", "WARNING") as logs:
+                await sqs.facet("name").aslice(0, 5)
+
+        self.assertIn("MixedAggregate", logs.output[0])
+        self.assertIn("Limit", logs.output[1])
+
+    # The database cache refuses to be called synchronously from async code.
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "search_cache",
+            }
+        }
+    )
+    async def test_async_result_cache(self):
+        connections["default"]._index = self.ui
+        await sync_to_async(call_command)("createcachetable", verbosity=0)
+        backend = connections["default"].get_backend()
+        query = await sync_to_async(self.sqs.auto_query("index").query.build_query)()
+
+        with mock.patch.object(backend, "result_cache_timeout", 60):
+            page = await backend.asearch(query, end_offset=5)
+
+            # Documents deleted behind the backend's back leave cached
+            # results as they were.
+            await SearchDocument.objects.all().adelete()
+            cached = await backend.asearch(query, end_offset=5)
+
+            self.assertEqual(cached["hits"], page["hits"])
+            self.assertEqual(
+                [result.pk for result in cached["results"]],
+                [result.pk for result in page["results"]],
+            )
+
+            await sync_to_async(backend.clear)()
+            self.assertEqual((await backend.asearch(query, end_offset=5))["hits"], 0)
+
+    def test_narrow(self):
+        expected = MockModel.objects.filter(author="daniel1").count()
+        self.assertLess(expected, MockModel.objects.count())
+
+        # As FacetedSearchForm narrows by a chosen facet value.
+        sqs = self.sqs.facet("name").narrow('name:"daniel1"')
+        self.assertEqual(sqs.count(), expected)
+        self.assertEqual(sqs.facet_counts()["fields"]["name"], [("daniel1", expected)])
+        self.assertEqual(self.sqs.narrow("name:daniel1").count(), expected)
+        self.assertEqual(
+            self.sqs.narrow("name:daniel1").narrow("name:daniel2").count(), 0
+        )
+
+        with self.assertRaisesMessage(SearchBackendError, "Can't narrow by"):
+            self.sqs.narrow("name:daniel1 OR name:daniel2").count()
+
+    def test_filter_types(self):
+        def pks(sqs):
+            return sorted(result.pk for result in sqs)
+
+        def model_pks(**lookups):
+            return list(
+                MockModel.objects.filter(**lookups)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+
+        self.assertEqual(
+            pks(self.sqs.filter(name__exact="daniel3")), model_pks(author="daniel3")
+        )
+        self.assertEqual(
+            pks(self.sqs.filter(name__in=["daniel1", "daniel3"])),
+            model_pks(author__in=["daniel1", "daniel3"]),
+        )
+        self.assertEqual(pks(self.sqs.filter(name__in=[])), [])
+        self.assertEqual(pks(self.sqs.filter(content__in=[])), [])
+        self.assertEqual(
+            pks(self.sqs.filter(content__in=["indexed", "template"])),
+            sorted(
+                {result.pk for result in self.sqs.filter(content="indexed")}
+                | {result.pk for result in self.sqs.filter(content="template")}
+            ),
+        )
+        self.assertEqual(
+            pks(self.sqs.filter(pub_date__gte=datetime(2009, 7, 1))),
+            model_pks(pub_date__gte=datetime(2009, 7, 1)),
+        )
+        self.assertEqual(
+            pks(self.sqs.filter(pub_date__lt=datetime(2009, 7, 1))),
+            model_pks(pub_date__lt=datetime(2009, 7, 1)),
+        )
+        self.assertEqual(
+            pks(
+                self.sqs.filter(
+                    pub_date__range=[datetime(2009, 6, 1), datetime(2009, 7, 1)]
+                )
+            ),
+            model_pks(pub_date__range=[datetime(2009, 6, 1), datetime(2009, 7, 1)]),
+        )
+        self.assertEqual(pks(self.sqs.filter(name__startswith="daniel")), model_pks())
+        self.assertEqual(
+            pks(self.sqs.filter(content="index", name__contains="el2")),
+            sorted(
+                result.pk
+                for result in self.sqs.filter(content="index")
+                if result.name == "daniel2"
+            ),
+        )
+
     def test_general_queries_unicode(self):
         self.assertEqual(len(self.sqs.auto_query("Привет")), 0)
 
@@ -369,3 +1553,12 @@ class LiveSimpleSearchQuerySetTestCase(TestCase):
         # MLT shouldn't be horribly broken. This used to throw an exception.
         mm1 = MockModel.objects.get(pk=1)
         self.assertEqual(len(self.sqs.filter(text=1).more_like_this(mm1)), 0)
+
+        sqs = self.sqs.more_like_this(mm1)
+        self.assertEqual(len(sqs), 21)
+        self.assertNotIn(1, [result.pk for result in sqs])
+        self.assertEqual(
+            [result.pk for result in sqs[2:4]],
+            [result.pk for result in self.sqs.more_like_this(mm1)][2:4],
+        )
+        self.assertEqual(len(self.sqs.filter(content="index").more_like_this(mm1)), 13)
@@ -1,10 +1,18 @@
+from datetime import date
+from unittest import mock
+
 from django.contrib.postgres.search import SearchQuery
-from django.db.models import Q
+from django.db.models import CharField, Q
+from django.db.models.functions import Cast
 from django.test import TestCase
 from haystack import connections
-from haystack.models import SearchResult
+from haystack.inputs import Exact
 from haystack.query import SQ
 
+from postgres_fts_backend import CompactSearchResult, WeightedSearchQuery
+from postgres_fts_backend.models import SearchDocument
+from tests.core.models import MockModel
+
 from .search_indexes import SimpleMockSearchIndex
 
 
@@ -16,6 +24,8 @@ class SimpleSearchQueryTestCase(TestCase):
         ui.build(indexes=[SimpleMockSearchIndex()])
 
         self.sq = connections["default"].get_query()
+        # Queries name the database's default configuration explicitly.
+        self.config = self.sq.backend.default_config()
 
     def test_build_query_all(self):
         self.assertEqual(self.sq.build_query(), Q())
@@ -24,30 +34,133 @@ class SimpleSearchQueryTestCase(TestCase):
         self.sq.add_filter(SQ(content="hello"))
         self.assertEqual(
             self.sq.build_query(),
-            Q(foo__search=SearchQuery("hello", search_type="websearch")),
+            Q(vector=SearchQuery("hello", search_type="websearch", config=self.config)),
+        )
+
+    def test_build_query_startswith(self):
+        self.sq.add_filter(SQ(content__startswith="ind doc"))
+        self.assertEqual(
+            self.sq.build_query(),
+            Q(
+                vector=SearchQuery(
+                    "'ind':* & 'doc':*", search_type="raw", config=self.config
+                )
+            ),
+        )
+
+    def test_build_prefix_query_escaping(self):
+        self.assertEqual(
+            self.sq.build_prefix_query("it's a:* | !(b"),
+            SearchQuery(
+                "'it':* & 's':* & 'a':* & 'b':*", search_type="raw", config=self.config
+            ),
+        )
+        self.assertEqual(
+            self.sq.build_prefix_query("ind doc", "A"),
+            WeightedSearchQuery(
+                "'ind':* & 'doc':*", "A", search_type="raw", config=self.config
+            ),
         )
 
     def test_build_query_multiple_word(self):
         self.sq.add_filter(SQ(name="foo"))
         self.sq.add_filter(SQ(name="bar"))
-        self.assertEqual(
+        self.assertQueryEqual(
             self.sq.build_query(),
-            Q(author__search=SearchQuery("foo", search_type="websearch"))
-            & Q(author__search=SearchQuery("bar", search_type="websearch")),
+            self.author_query(
+                SearchQuery("foo", search_type="websearch", config=self.config)
+            )
+            & self.author_query(
+                SearchQuery("bar", search_type="websearch", config=self.config)
+            ),
         )
 
     def test_build_query_or(self):
         self.sq.add_filter(SQ(name="foo"))
         self.sq.add_filter(SQ(name="bar"), use_or=True)
-        self.assertEqual(
+        self.assertQueryEqual(
             self.sq.build_query(),
-            Q(author__search=SearchQuery("foo", search_type="websearch"))
-            | Q(author__search=SearchQuery("bar", search_type="websearch")),
+            self.author_query(
+                SearchQuery("foo", search_type="websearch", config=self.config)
+            )
+            | self.author_query(
+                SearchQuery("bar", search_type="websearch", config=self.config)
+            ),
+        )
+
+    def test_build_query_unknown_field(self):
+        self.sq.add_filter(SQ(unknown="foo"))
+        with self.assertRaises(ValueError):
+            self.sq.build_query()
+
+    def test_build_query_cache(self):
+        self.sq.add_filter(SQ(content="hello"))
+        self.sq.add_filter(SQ(name="foo"))
+        query = self.sq.build_query()
+
+        other = connections["default"].get_query()
+        other.add_filter(SQ(name="foo"))
+        other.add_filter(SQ(content="hello"))
+
+        with mock.patch.object(
+            other, "build_query_fragment", wraps=other.build_query_fragment
+        ) as build_query_fragment:
+            self.assertIs(other.build_query(), query)
+            build_query_fragment.assert_not_called()
+
+        # Rebuilding the index starts a fresh cache.
+        connections["default"].get_unified_index().build(
+            indexes=[SimpleMockSearchIndex()]
+        )
+        self.assertIsNot(self.sq.build_query(), query)
+        self.assertQueryEqual(self.sq.build_query(), query)
+
+    def test_build_query_uncacheable(self):
+        self.sq.add_filter(SQ(name__in=MockModel.objects.values_list("author")))
+        self.assertIsNone(self.sq.query_filter.cache_key())
+        self.sq.build_query()
+
+    def test_build_query_filter_types(self):
+        self.sq.add_filter(SQ(name__exact="foo-bar"))
+        self.sq.add_filter(SQ(name__in=["a", "b"]))
+        self.sq.add_filter(SQ(name__startswith="dan"))
+        self.sq.add_filter(SQ(pub_date__gte=date(2009, 2, 10)))
+        self.sq.add_filter(SQ(pub_date__range=[date(2009, 1, 1), date(2010, 1, 1)]))
+        self.assertQueryEqual(
+            self.sq.build_query(),
+            self.model_query(author__exact="foo-bar")
+            & self.model_query(author__in=["a", "b"])
+            & self.model_query(author__startswith="dan")
+            & self.model_query(pub_date__gte=date(2009, 2, 10))
+            & self.model_query(pub_date__range=[date(2009, 1, 1), date(2010, 1, 1)]),
+        )
+
+    def test_build_query_exact_input(self):
+        self.sq.add_filter(SQ(name=Exact("foo bar")))
+        self.assertQueryEqual(
+            self.sq.build_query(), self.model_query(author__exact="foo bar")
+        )
+
+    def author_query(self, search_query):
+        return self.model_query(author__search=search_query)
+
+    def model_query(self, **lookups):
+        objects = (
+            MockModel.objects.filter(**lookups)
+            .annotate(fts_id=Cast("pk", CharField()))
+            .values("fts_id")
+        )
+        return Q(django_ct="core.mockmodel", django_id__in=objects)
+
+    def assertQueryEqual(self, first, second):
+        self.assertEqual(
+            str(SearchDocument.objects.filter(first).query),
+            str(SearchDocument.objects.filter(second).query),
         )
 
     def test_set_result_class(self):
-        # Assert that we're defaulting to ``SearchResult``.
-        self.assertTrue(issubclass(self.sq.result_class, SearchResult))
+        # Assert that we're defaulting to ``CompactSearchResult``.
+        self.assertTrue(issubclass(self.sq.result_class, CompactSearchResult))
 
         # Custom class.
         class IttyBittyResult:
@@ -58,4 +171,4 @@ class SimpleSearchQueryTestCase(TestCase):
 
         # Reset to default.
         self.sq.set_result_class(None)
-        self.assertTrue(issubclass(self.sq.result_class, SearchResult))
+        self.assertTrue(issubclass(self.sq.result_class, CompactSearchResult))